@@ -1,12 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager, aclosing
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal, Tuple
+import asyncio
+import base64
+import binascii
+import json
 import logging
 import os
+import time
+from datetime import datetime, timezone
 
-from services.snowflake_service import get_snowflake_service, close_snowflake_service
+from services.snowflake_service import SnowflakeService, get_snowflake_service, close_snowflake_service
+from services.result_cache import CachedResult
+from services.concurrency import ConcurrencyLimiter, ConcurrencyLimitError
+from services.live_feed import LiveSensorFeed, FeedFullError
+from services.sensor_buffer import SensorBufferStore
+from services.serialization import CompressionMiddleware, FastJSONResponse, FastJSONRoute, dumps
+from services.metrics import REGISTRY, MetricsMiddleware
+from services.request_context import RequestContextMiddleware
+from services.jobs import Job, JobNotFoundError, JobStore
+from services.data_versions import DataVersion, DataVersionTracker
+from services.warmup import WarmUp
+from services import request_context
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,14 +32,29 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start = time.perf_counter()
     get_snowflake_service()
-    logger.info("Snowflake connection initialized")
+    logger.info(f"Snowflake connection initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if WARM_START:
+        warm_up.start()
     yield
+    await warm_up.stop()
+    await live_feed.stop()
     close_snowflake_service()
     logger.info("Snowflake connection closed")
 
 
-app = FastAPI(title="Snowcore Copilot API", lifespan=lifespan)
+app = FastAPI(title="Snowcore Copilot API", lifespan=lifespan, default_response_class=FastJSONResponse)
+# Route return values are rendered directly rather than validated against
+# response_model and walked by jsonable_encoder; see FastJSONRoute.
+app.router.route_class = FastJSONRoute
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024")),
+)
+# Request ids and routes are attached to every Snowflake statement as QUERY_TAG.
+app.add_middleware(RequestContextMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,11 +63,82 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost: latency includes compression and byte counts
+# are what went over the wire.
+app.add_middleware(MetricsMiddleware)
+
+# Per-route caps on in-flight requests. Live polling gets the most headroom;
+# chat holds an executor thread for the whole agent run, so it gets the least.
+ROUTE_LIMITS = {
+    "decisions": ConcurrencyLimiter("decisions", 8),
+    "anomalies": ConcurrencyLimiter("anomalies", 8),
+    "failure-probability": ConcurrencyLimiter("failure-probability", 8),
+    "anomaly-events": ConcurrencyLimiter("anomaly-events", 8),
+    "live-sensors": ConcurrencyLimiter("live-sensors", 16),
+    "live-sensors-by-asset": ConcurrencyLimiter("live-sensors-by-asset", 16),
+    "live-thresholds": ConcurrencyLimiter("live-thresholds", 16),
+    "cure-results": ConcurrencyLimiter("cure-results", 8),
+    "gnn-propagation": ConcurrencyLimiter("gnn-propagation", 4),
+    "task-status": ConcurrencyLimiter("task-status", 4),
+    "anomaly-triggers": ConcurrencyLimiter("anomaly-triggers", 4),
+    "toggle-simulation": ConcurrencyLimiter("toggle-simulation", 2),
+    "inject-anomaly": ConcurrencyLimiter("inject-anomaly", 2),
+    "snapshot": ConcurrencyLimiter("snapshot", 8),
+    "chat": ConcurrencyLimiter("chat", 4, max_wait=30.0),
+    "chat-stream": ConcurrencyLimiter("chat-stream", 8, max_wait=30.0),
+    "jobs": ConcurrencyLimiter("jobs", 8),
+    "job-results": ConcurrencyLimiter("job-results", 4),
+}
+
+
+# Result cache TTLs, in seconds, chosen from how often each source refreshes:
+# MAINTENANCE_DECISIONS_LIVE has a 1 minute TARGET_LAG, FAILURE_PROBABILITY_TASK
+# and ANOMALY_DETECTION_TASK run every 5 minutes, and cure results and GNN scores
+# only change when batches complete or the notebook is re-run.
+CACHE_TTLS = {
+    "decisions": 30,
+    "failure-probability": 60,
+    "anomaly-events": 60,
+    "cure-results": 300,
+    "gnn-propagation": 300,
+    "gnn-latest-run": 60,
+}
+
+# How long past its TTL a cached dashboard result is still served, marked
+# "stale", while it reloads in the background. Beyond this a request waits for
+# Snowflake and fails if Snowflake does. 0 turns stale serving off.
+MAX_STALE_SECONDS = float(os.getenv("RESULT_CACHE_MAX_STALE_SECONDS", "600"))
+
+# Conditional GET. Read endpoints tag responses with an ETag built from their
+# source tables' change tokens, so a poll that still holds the current version
+# gets 304 before any data query runs or anything is serialized. All tokens come
+# from one metadata statement, shared by every endpoint for DATA_VERSION_TTL.
+# MAINTENANCE_DECISIONS_LIVE is a dynamic table whose refreshes lag its sources,
+# and SHOW TASKS has no change marker, so those endpoints are not tagged.
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL_SECONDS", "2"))
+data_versions = DataVersionTracker([
+    "SNOWCORE_PDM.PDM.FAILURE_PROBABILITY",
+    "SNOWCORE_PDM.PDM.ANOMALY_EVENTS",
+    "SNOWCORE_PDM.PDM.CURE_RESULTS",
+    "SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES",
+    "SNOWCORE_PDM.PDM.GNN_LATEST_RUN",
+    "SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS",
+])
+
+
+@app.exception_handler(ConcurrencyLimitError)
+async def concurrency_limit_handler(request: Request, exc: ConcurrencyLimitError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
 
 
 class ChatMessage(BaseModel):
     message: str
     thread_id: Optional[str] = None
+    bypass_cache: bool = False
 
 
 class ToggleSimulationRequest(BaseModel):
@@ -43,6 +147,13 @@ class ToggleSimulationRequest(BaseModel):
 
 class InjectAnomalyRequest(BaseModel):
     asset_id: Optional[str] = None
+    # Fault drills: several assets at once, in addition to asset_id.
+    asset_ids: List[str] = []
+
+
+class JobRequest(BaseModel):
+    analysis: str
+    asset_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
@@ -54,6 +165,133 @@ class ChatResponse(BaseModel):
 
 class DecisionsResponse(BaseModel):
     decisions: List[Dict[str, Any]]
+    stale: bool = False
+    data_age_seconds: Optional[float] = None
+
+
+# Telemetry endpoints accept ?format=columnar to get {"columns": [...], "data": {col: [...]}}
+# instead of one object per row, which is much smaller for large result sets.
+ResponseFormat = Literal["rows", "columnar"]
+
+
+def _first_value(data: Any, column: str) -> Any:
+    """First value of ``column`` from either a row list or a columnar result."""
+    if isinstance(data, dict):
+        values = data["data"].get(column) or [None]
+        return values[0]
+    return data[0][column] if data else None
+
+
+def _max_value(data: Any, column: str) -> Any:
+    """Largest non-null value of ``column`` from either a row list or a columnar result."""
+    values = data["data"].get(column, []) if isinstance(data, dict) else [row[column] for row in data]
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+# Live-sensor polls pass the last returned watermark as ?since= and only get rows
+# ingested after it. Without it the full 30 second window is returned.
+EPOCH = datetime(1970, 1, 1)
+
+
+def _watermark(data: Any, since: Optional[datetime]) -> Optional[str]:
+    newest = _max_value(data, "INGESTION_TIME") or since
+    return newest.isoformat() if newest else None
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def _freshness(result: CachedResult) -> Dict[str, Any]:
+    return {"stale": result.stale, "data_age_seconds": round(result.age, 1)}
+
+
+async def _data_version(service: SnowflakeService, *tables: str, extra: str = "") -> Optional[DataVersion]:
+    """Current version of ``tables``, or None (no conditional GET) if it can't be read."""
+    if not DATA_VERSION_TTL:
+        return None
+    try:
+        rows = await service.execute_query_cached(data_versions.query, timeout=10, ttl=DATA_VERSION_TTL)
+    except Exception as e:
+        logger.warning(f"Could not read data versions, skipping conditional GET: {e}")
+        return None
+    if rows:
+        data_versions.observe(rows[0])
+    return data_versions.version(tables, extra)
+
+
+def _not_modified(request: Request, version: Optional[DataVersion]) -> Optional[Response]:
+    if version is not None and version.matches(
+        request.headers.get("if-none-match"), request.headers.get("if-modified-since")
+    ):
+        return Response(status_code=304, headers=version.headers())
+    return None
+
+
+def _versioned(content: Dict[str, Any], version: Optional[DataVersion]) -> Any:
+    """Attach ``version``'s validators to a response body.
+
+    A stale cached result predates ``version``, so it goes out untagged and the
+    client's next poll gets the refreshed data in full.
+    """
+    if version is None or content.get("stale"):
+        return content
+    return FastJSONResponse(content, headers=version.headers())
+
+
+def _empty(format: ResponseFormat) -> Any:
+    return {"columns": [], "data": {}} if format == "columnar" else []
+
+
+def _formatted(rows: List[Dict[str, Any]], format: ResponseFormat) -> Any:
+    """Rows built in Python, in the same shape ``execute_query_async`` returns for ``format``."""
+    if format != "columnar":
+        return rows
+    columns = list(rows[0]) if rows else []
+    return {"columns": columns, "data": {column: [row[column] for row in rows] for column in columns}}
+
+
+# Event and cure-result lists page with keyset cursors. A cursor encodes the sort
+# key of the last row returned, (timestamp, id), and the next page is the rows
+# strictly after it in the same order. Each page is the same bounded, pruned scan
+# however deep the client has scrolled, unlike OFFSET which rescans every
+# skipped row.
+MAX_PAGE_SIZE = 500
+
+
+def _encode_cursor(timestamp: Any, key: Any) -> str:
+    payload = json.dumps([timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp, key])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Tuple[Optional[datetime], Optional[str]]:
+    if not cursor:
+        return None, None
+    try:
+        timestamp, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (datetime.fromisoformat(timestamp) if timestamp is not None else None), str(key)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _paged(data: Any, page_size: int, time_column: str, key_column: str) -> Tuple[Any, Optional[str]]:
+    """Trim a ``page_size + 1`` row result to one page, with the cursor for the next page if there is one."""
+    if isinstance(data, dict):
+        values = data["data"]
+        if len(values.get(key_column, [])) <= page_size:
+            return data, None
+        data = {
+            "columns": data["columns"],
+            "data": {column: column_values[:page_size] for column, column_values in values.items()},
+        }
+        last = (data["data"][time_column][-1], data["data"][key_column][-1])
+    else:
+        if len(data) <= page_size:
+            return data, None
+        data = data[:page_size]
+        last = (data[-1][time_column], data[-1][key_column])
+    return data, _encode_cursor(*last)
 
 
 @app.get("/")
@@ -61,101 +299,276 @@ async def health():
     return {"status": "healthy", "service": "snowcore-copilot"}
 
 
-@app.get("/api/decisions", response_model=DecisionsResponse)
+def _workload_gauge(collect):
+    return lambda: {
+        (name,): collect(workload) for name, workload in get_snowflake_service().stats()["workloads"].items()
+    }
+
+
+REGISTRY.gauge_callback(
+    "snowflake_pool_connections",
+    "Open pooled Snowflake connections by workload class and state.",
+    lambda: {
+        (name, state): workload["pool"][state]
+        for name, workload in get_snowflake_service().stats()["workloads"].items()
+        for state in ("in_use", "idle")
+    },
+    ("workload", "state"),
+)
+REGISTRY.gauge_callback(
+    "snowflake_workload_in_flight",
+    "Snowflake work admitted and running, by workload class.",
+    _workload_gauge(lambda workload: workload["in_flight"]),
+    ("workload",),
+)
+REGISTRY.gauge_callback(
+    "snowflake_workload_queue_depth",
+    "Snowflake work waiting for an admission slot, by workload class.",
+    _workload_gauge(lambda workload: workload["queue_depth"]),
+    ("workload",),
+)
+REGISTRY.gauge_callback(
+    "snowflake_workload_rejected",
+    "Snowflake work rejected since startup because its class queue was full or the wait timed out.",
+    _workload_gauge(lambda workload: workload["rejected"]),
+    ("workload",),
+)
+REGISTRY.gauge_callback(
+    "route_requests_in_flight",
+    "Requests holding a route concurrency slot.",
+    lambda: {(name,): limiter.stats()["in_flight"] for name, limiter in ROUTE_LIMITS.items()},
+    ("route",),
+)
+REGISTRY.gauge_callback(
+    "live_feed_subscribers",
+    "Connected /api/live-sensors/stream clients.",
+    lambda: {(): live_feed.stats()["subscribers"]},
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/debug/slow-queries")
+async def get_slow_queries():
+    """Slowest recent Snowflake statements, with the sfqid to open in Query History."""
+    return get_snowflake_service().slow_queries()
+
+
+@app.get("/api/debug/stats")
+async def get_debug_stats():
+    service = get_snowflake_service()
+    return {
+        **service.stats(),
+        "routes": {name: limiter.stats() for name, limiter in ROUTE_LIMITS.items()},
+        "live_feed": live_feed.stats(),
+        "jobs": jobs.stats(),
+        "sensor_buffers": sensor_buffers.stats(),
+    }
+
+
+async def _load_decisions(service: SnowflakeService) -> Dict[str, Any]:
+    result = await service.execute_query_swr(
+        """
+        SELECT 
+            ASSET_ID,
+            P_FAIL_7D,
+            EXPECTED_UNPLANNED_COST,
+            C_PM_USD,
+            NET_BENEFIT,
+            RECOMMENDATION,
+            TARGET_WINDOW,
+            CONFIDENCE
+        FROM SNOWCORE_PDM.PDM.MAINTENANCE_DECISIONS_LIVE
+        ORDER BY NET_BENEFIT DESC
+        """,
+        timeout=30,
+        ttl=CACHE_TTLS["decisions"],
+        max_stale=MAX_STALE_SECONDS,
+    )
+    return {"decisions": result.value, **_freshness(result)}
+
+
+@app.get("/api/decisions", response_model=DecisionsResponse, dependencies=[Depends(ROUTE_LIMITS["decisions"])])
 async def get_decisions():
     service = get_snowflake_service()
     try:
-        data = service.execute_query(
-            """
-            SELECT 
-                ASSET_ID,
-                P_FAIL_7D,
-                EXPECTED_UNPLANNED_COST,
-                C_PM_USD,
-                NET_BENEFIT,
-                RECOMMENDATION,
-                TARGET_WINDOW,
-                CONFIDENCE
-            FROM SNOWCORE_PDM.PDM.MAINTENANCE_DECISIONS_LIVE
-            ORDER BY NET_BENEFIT DESC
-            """,
-            timeout=30,
-        )
-        return {"decisions": data}
+        return await _load_decisions(service)
     except Exception as e:
         logger.error(f"Failed to fetch decisions: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch maintenance decisions")
 
 
-@app.get("/api/anomalies")
-async def get_anomalies():
+@app.get("/api/anomalies", dependencies=[Depends(ROUTE_LIMITS["anomalies"])])
+async def get_anomalies(
+    request: Request,
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    asset_id: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+):
+    """Anomaly events from the last 24 hours, newest first, paged by ``cursor``."""
     service = get_snowflake_service()
+    after_timestamp, after_id = _decode_cursor(cursor)
+    # Rows also leave the 24 hour window as time passes, so the version rolls over every minute.
+    version = await _data_version(service, "SNOWCORE_PDM.PDM.ANOMALY_EVENTS", extra=str(int(time.time() // 60)))
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        data = service.execute_query(
+        data = await service.execute_query_async(
             """
             SELECT * FROM SNOWCORE_PDM.PDM.ANOMALY_EVENTS
-            WHERE EVENT_TIME > DATEADD(hour, -24, CURRENT_TIMESTAMP())
-            ORDER BY EVENT_TIME DESC
-            LIMIT 20
+            WHERE TIMESTAMP > DATEADD(hour, -24, CURRENT_TIMESTAMP())
+              AND (%(asset_id)s IS NULL OR ASSET_ID = %(asset_id)s)
+              AND (%(severity)s IS NULL OR SEVERITY = %(severity)s)
+              AND (%(after_timestamp)s IS NULL
+                   OR TIMESTAMP < %(after_timestamp)s
+                   OR (TIMESTAMP = %(after_timestamp)s AND EVENT_ID < %(after_id)s))
+            ORDER BY TIMESTAMP DESC, EVENT_ID DESC
+            LIMIT %(limit)s
             """,
+            params={
+                "asset_id": asset_id,
+                "severity": severity.upper() if severity else None,
+                "after_timestamp": after_timestamp,
+                "after_id": after_id,
+                "limit": page_size + 1,
+            },
             timeout=30,
         )
-        return {"anomalies": data}
+        data, next_cursor = _paged(data, page_size, "TIMESTAMP", "EVENT_ID")
+        return _versioned({"anomalies": data, "next_cursor": next_cursor}, version)
     except Exception as e:
         logger.error(f"Failed to fetch anomalies: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch anomalies")
 
 
-@app.get("/api/failure-probability")
-async def get_failure_probability():
+async def _load_failure_probability(
+    service: SnowflakeService,
+    version: Optional[DataVersion] = None,
+) -> Dict[str, Any]:
+    result = await service.execute_query_swr(
+        """
+        SELECT * FROM SNOWCORE_PDM.PDM.FAILURE_PROBABILITY
+        ORDER BY ASSET_ID
+        """,
+        timeout=30,
+        ttl=CACHE_TTLS["failure-probability"],
+        max_stale=MAX_STALE_SECONDS,
+        version=version,
+    )
+    return {"probabilities": result.value, **_freshness(result)}
+
+
+@app.get("/api/failure-probability", dependencies=[Depends(ROUTE_LIMITS["failure-probability"])])
+async def get_failure_probability(request: Request):
     service = get_snowflake_service()
+    version = await _data_version(service, "SNOWCORE_PDM.PDM.FAILURE_PROBABILITY")
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        data = service.execute_query(
-            """
-            SELECT * FROM SNOWCORE_PDM.PDM.FAILURE_PROBABILITY
-            ORDER BY ASSET_ID
-            """,
-            timeout=30,
-        )
-        return {"probabilities": data}
+        return _versioned(await _load_failure_probability(service, version), version)
     except Exception as e:
         logger.error(f"Failed to fetch failure probabilities: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch failure probabilities")
 
 
-@app.get("/api/anomaly-events")
-async def get_anomaly_events():
+async def _load_anomaly_events(
+    service: SnowflakeService,
+    format: ResponseFormat = "rows",
+    page_size: int = 50,
+    cursor: Optional[str] = None,
+    asset_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    version: Optional[DataVersion] = None,
+) -> Dict[str, Any]:
+    # Rows without a timestamp sort after all others; a cursor on one of them has
+    # a null timestamp and continues among the null rows by EVENT_ID alone.
+    after_timestamp, after_id = _decode_cursor(cursor)
+    result = await service.execute_query_swr(
+        """
+        SELECT 
+            EVENT_ID,
+            ASSET_ID,
+            TIMESTAMP,
+            ANOMALY_TYPE,
+            ANOMALY_SCORE,
+            SEVERITY,
+            ROOT_CAUSE,
+            SUGGESTED_FIX,
+            RESOLVED
+        FROM SNOWCORE_PDM.PDM.ANOMALY_EVENTS
+        WHERE (%(asset_id)s IS NULL OR ASSET_ID = %(asset_id)s)
+          AND (%(severity)s IS NULL OR SEVERITY = %(severity)s)
+          AND (%(after_id)s IS NULL
+               OR TIMESTAMP < %(after_timestamp)s
+               OR (TIMESTAMP = %(after_timestamp)s AND EVENT_ID < %(after_id)s)
+               OR (TIMESTAMP IS NULL AND (%(after_timestamp)s IS NOT NULL OR EVENT_ID < %(after_id)s)))
+        ORDER BY TIMESTAMP DESC NULLS LAST, EVENT_ID DESC
+        LIMIT %(limit)s
+        """,
+        params={
+            "asset_id": asset_id,
+            "severity": severity.upper() if severity else None,
+            "after_timestamp": after_timestamp,
+            "after_id": after_id,
+            "limit": page_size + 1,
+        },
+        timeout=30,
+        columnar=format == "columnar",
+        ttl=CACHE_TTLS["anomaly-events"],
+        max_stale=MAX_STALE_SECONDS,
+        version=version,
+    )
+    events, next_cursor = _paged(result.value, page_size, "TIMESTAMP", "EVENT_ID")
+    return {"events": events, "next_cursor": next_cursor, **_freshness(result)}
+
+
+@app.get("/api/anomaly-events", dependencies=[Depends(ROUTE_LIMITS["anomaly-events"])])
+async def get_anomaly_events(
+    request: Request,
+    format: ResponseFormat = Query("rows"),
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    asset_id: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+):
     service = get_snowflake_service()
+    # Decoded up front so a bad cursor is a 400 rather than a 500.
+    _decode_cursor(cursor)
+    version = await _data_version(service, "SNOWCORE_PDM.PDM.ANOMALY_EVENTS")
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        data = service.execute_query(
-            """
-            SELECT 
-                EVENT_ID,
-                ASSET_ID,
-                TIMESTAMP,
-                ANOMALY_TYPE,
-                ANOMALY_SCORE,
-                SEVERITY,
-                ROOT_CAUSE,
-                SUGGESTED_FIX,
-                RESOLVED
-            FROM SNOWCORE_PDM.PDM.ANOMALY_EVENTS
-            ORDER BY TIMESTAMP DESC
-            LIMIT 50
-            """,
-            timeout=30,
-        )
-        return {"events": data}
+        content = await _load_anomaly_events(service, format, page_size, cursor, asset_id, severity, version)
+        return _versioned(content, version)
     except Exception as e:
         logger.error(f"Failed to fetch anomaly events: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch anomaly events")
 
 
-@app.get("/api/live-sensors")
-async def get_live_sensors():
+@app.get("/api/live-sensors", dependencies=[Depends(ROUTE_LIMITS["live-sensors"])])
+async def get_live_sensors(
+    format: ResponseFormat = Query("rows"),
+    since: Optional[datetime] = Query(None),
+):
     service = get_snowflake_service()
+    since = since.replace(tzinfo=None) if since else None
+    if _use_buffers():
+        data = _formatted(sensor_buffers.by_event_time(since=since), format)
+        latest = _first_value(data, "INGESTION_TIME")
+        return {
+            "sensors": data,
+            "timestamp": str(latest) if latest else None,
+            "watermark": _watermark(data, since),
+        }
     try:
-        data = service.execute_query(
+        data = await service.execute_query_async(
             """
             WITH parsed AS (
                 SELECT 
@@ -166,6 +579,7 @@ async def get_live_sensors():
                 FROM SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE,
                 LATERAL FLATTEN(input => RECORD_CONTENT:metrics) m
                 WHERE INGESTION_TIME > DATEADD('second', -30, CURRENT_TIMESTAMP())
+                  AND INGESTION_TIME > %(since)s
             )
             SELECT 
                 EVENT_TIME,
@@ -180,238 +594,763 @@ async def get_live_sensors():
             ORDER BY EVENT_TIME DESC
             LIMIT 50
             """,
+            params={"since": since or EPOCH},
             timeout=10,
+            columnar=format == "columnar",
+            workload="live",
         )
-        return {"sensors": data, "timestamp": str(data[0]["INGESTION_TIME"]) if data else None}
+        latest = _first_value(data, "INGESTION_TIME")
+        return {
+            "sensors": data,
+            "timestamp": str(latest) if latest else None,
+            "watermark": _watermark(data, since),
+        }
     except Exception as e:
         logger.error(f"Failed to fetch live sensors: {e}")
-        return {"sensors": [], "timestamp": None}
+        return {"sensors": _empty(format), "timestamp": None, "watermark": _watermark([], since)}
 
 
-@app.get("/api/live-sensors-by-asset")
-async def get_live_sensors_by_asset():
-    service = get_snowflake_service()
-    try:
-        data = service.execute_query(
-            """
-            WITH parsed AS (
-                SELECT 
-                    SPLIT_PART(RECORD_METADATA:topic::STRING, '/', -1) AS ASSET_ID,
-                    TO_TIMESTAMP(RECORD_CONTENT:timestamp::NUMBER / 1000) AS EVENT_TIME,
-                    m.value:name::STRING AS METRIC_NAME,
-                    m.value:value::FLOAT AS METRIC_VALUE,
-                    INGESTION_TIME
-                FROM SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE,
-                LATERAL FLATTEN(input => RECORD_CONTENT:metrics) m
-                WHERE INGESTION_TIME > DATEADD('second', -30, CURRENT_TIMESTAMP())
-            )
+async def _load_live_sensors_by_asset(
+    service: SnowflakeService,
+    since: Optional[datetime] = None,
+    format: ResponseFormat = "rows",
+    window_seconds: int = 30,
+) -> Any:
+    return await service.execute_query_async(
+        """
+        WITH parsed AS (
             SELECT 
-                ASSET_ID,
-                EVENT_TIME,
-                MAX(CASE WHEN METRIC_NAME = 'Temperature' THEN METRIC_VALUE END) AS TEMPERATURE_C,
-                MAX(CASE WHEN METRIC_NAME = 'Humidity' THEN METRIC_VALUE END) AS HUMIDITY_PCT,
-                MAX(CASE WHEN METRIC_NAME = 'Pressure' THEN METRIC_VALUE END) AS PRESSURE_PSI,
-                MAX(CASE WHEN METRIC_NAME = 'Vibration' THEN METRIC_VALUE END) AS VIBRATION_G,
-                MAX(CASE WHEN METRIC_NAME = 'VacuumLevel' THEN METRIC_VALUE END) AS VACUUM_MBAR,
-                MAX(INGESTION_TIME) AS INGESTION_TIME
-            FROM parsed
-            GROUP BY ASSET_ID, EVENT_TIME
-            ORDER BY ASSET_ID, EVENT_TIME DESC
-            """,
-            timeout=10,
+                SPLIT_PART(RECORD_METADATA:topic::STRING, '/', -1) AS ASSET_ID,
+                TO_TIMESTAMP(RECORD_CONTENT:timestamp::NUMBER / 1000) AS EVENT_TIME,
+                m.value:name::STRING AS METRIC_NAME,
+                m.value:value::FLOAT AS METRIC_VALUE,
+                INGESTION_TIME
+            FROM SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE,
+            LATERAL FLATTEN(input => RECORD_CONTENT:metrics) m
+            WHERE INGESTION_TIME > DATEADD('second', -%(window_seconds)s, CURRENT_TIMESTAMP())
+              AND INGESTION_TIME > %(since)s
         )
-        return {"sensors": data, "timestamp": str(data[0]["INGESTION_TIME"]) if data else None}
+        SELECT 
+            ASSET_ID,
+            EVENT_TIME,
+            MAX(CASE WHEN METRIC_NAME = 'Temperature' THEN METRIC_VALUE END) AS TEMPERATURE_C,
+            MAX(CASE WHEN METRIC_NAME = 'Humidity' THEN METRIC_VALUE END) AS HUMIDITY_PCT,
+            MAX(CASE WHEN METRIC_NAME = 'Pressure' THEN METRIC_VALUE END) AS PRESSURE_PSI,
+            MAX(CASE WHEN METRIC_NAME = 'Vibration' THEN METRIC_VALUE END) AS VIBRATION_G,
+            MAX(CASE WHEN METRIC_NAME = 'VacuumLevel' THEN METRIC_VALUE END) AS VACUUM_MBAR,
+            MAX(INGESTION_TIME) AS INGESTION_TIME
+        FROM parsed
+        GROUP BY ASSET_ID, EVENT_TIME
+        ORDER BY ASSET_ID, EVENT_TIME DESC
+        """,
+        params={"since": since or EPOCH, "window_seconds": window_seconds},
+        timeout=10,
+        columnar=format == "columnar",
+        workload="live",
+    )
+
+
+@app.get("/api/live-sensors-by-asset", dependencies=[Depends(ROUTE_LIMITS["live-sensors-by-asset"])])
+async def get_live_sensors_by_asset(
+    format: ResponseFormat = Query("rows"),
+    since: Optional[datetime] = Query(None),
+):
+    service = get_snowflake_service()
+    since = since.replace(tzinfo=None) if since else None
+    if _use_buffers():
+        data = _formatted(sensor_buffers.by_asset(since=since), format)
+        latest = _first_value(data, "INGESTION_TIME")
+        return {
+            "sensors": data,
+            "timestamp": str(latest) if latest else None,
+            "watermark": _watermark(data, since),
+        }
+    try:
+        data = await _load_live_sensors_by_asset(service, since, format)
+        latest = _first_value(data, "INGESTION_TIME")
+        return {
+            "sensors": data,
+            "timestamp": str(latest) if latest else None,
+            "watermark": _watermark(data, since),
+        }
     except Exception as e:
         logger.error(f"Failed to fetch live sensors by asset: {e}")
-        return {"sensors": [], "timestamp": None}
+        return {"sensors": _empty(format), "timestamp": None, "watermark": _watermark([], since)}
+
+
+@app.get("/api/live-thresholds", dependencies=[Depends(ROUTE_LIMITS["live-thresholds"])])
+async def get_live_thresholds():
+    """One-minute average of each metric per asset, graded WARNING/CRITICAL like the Streamlit app."""
+    if _use_buffers():
+        return {"assets": sensor_buffers.threshold_status(), "source": "buffers"}
+    try:
+        rows = await _load_live_sensors_by_asset(get_snowflake_service(), window_seconds=60)
+    except Exception as e:
+        logger.error(f"Failed to fetch live thresholds: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch live thresholds")
+    store = SensorBufferStore(SENSOR_BUFFER_CAPACITY)
+    store.ingest(rows)
+    return {"assets": store.threshold_status(), "source": "snowflake"}
+
+
+async def _poll_live_sensors(since: Optional[datetime]) -> List[Dict[str, Any]]:
+    # The first poll after startup or an idle spell backfills the whole
+    # retention window (after the watermark) so the buffers are complete before
+    # they serve requests again.
+    window_seconds = SENSOR_BUFFER_RETENTION_SECONDS if SENSOR_BUFFERS_ENABLED and not _buffers_fresh() else 30
+    with request_context.background("live-feed"):
+        rows = await _load_live_sensors_by_asset(get_snowflake_service(), since, window_seconds=window_seconds)
+    if SENSOR_BUFFERS_ENABLED:
+        sensor_buffers.ingest(rows)
+        sensor_buffers.mark_refreshed()
+    return rows
+
+
+# Recent readings per asset held in NumPy ring buffers and fed by the shared
+# poller, so the live endpoints and threshold checks are answered from memory.
+# The poller feeds them only while they are in demand: the first live request
+# starts it, and it stops SENSOR_BUFFER_IDLE_SECONDS after the last one so the
+# warehouse can suspend. While the buffers are cold (after a restart or an idle
+# spell) requests go to Snowflake until a poll has backfilled
+# SENSOR_BUFFER_RETENTION_SECONDS of history, and again whenever polling has
+# failed for longer than a few intervals.
+SENSOR_BUFFERS_ENABLED = os.getenv("SENSOR_BUFFERS_ENABLED", "true").lower() in ("1", "true", "yes")
+SENSOR_BUFFER_RETENTION_SECONDS = int(os.getenv("SENSOR_BUFFER_RETENTION_SECONDS", "120"))
+SENSOR_BUFFER_CAPACITY = int(os.getenv("SENSOR_BUFFER_CAPACITY", "600"))
+SENSOR_BUFFER_IDLE_SECONDS = float(os.getenv("SENSOR_BUFFER_IDLE_SECONDS", "120"))
+sensor_buffers = SensorBufferStore(SENSOR_BUFFER_CAPACITY)
+
+# One shared poller for /api/live-sensors/stream and the sensor buffers; every
+# subscriber is served from the same incremental query.
+live_feed = LiveSensorFeed(
+    _poll_live_sensors,
+    interval=float(os.getenv("LIVE_FEED_INTERVAL_SECONDS", "1")),
+    max_subscribers=int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", "200")),
+    idle_timeout=SENSOR_BUFFER_IDLE_SECONDS if SENSOR_BUFFERS_ENABLED else 0,
+)
 
 
-@app.get("/api/cure-results")
-async def get_cure_results():
+def _buffers_fresh() -> bool:
+    return SENSOR_BUFFERS_ENABLED and sensor_buffers.fresh(max_age=max(5 * live_feed.interval, 5))
+
+
+def _use_buffers() -> bool:
+    """Whether a live request can be answered from the buffers; also keeps them fed."""
+    if SENSOR_BUFFERS_ENABLED:
+        live_feed.touch()
+    return _buffers_fresh()
+
+
+LIVE_FEED_KEEPALIVE_SECONDS = 15
+
+
+@app.get("/api/live-sensors/stream")
+async def stream_live_sensors(request: Request, asset_id: Optional[List[str]] = Query(None)):
+    """Push live sensor rows as Server-Sent Events from the shared background poller.
+
+    Sends a ``snapshot`` event with the current 30 second window, then a
+    ``sensors`` event for each batch of new rows. Repeat ``asset_id`` to filter.
+    """
+    async def event_source():
+        # Subscribe inside the stream, like the chat stream's route slot, so a
+        # response that is never iterated never holds a subscriber (and never
+        # keeps the poller running).
+        try:
+            subscription = live_feed.subscribe(set(asset_id) if asset_id else None)
+        except FeedFullError as e:
+            yield _sse("error", {"message": str(e)})
+            return
+        try:
+            yield _sse("snapshot", {
+                "sensors": live_feed.window(subscription),
+                "watermark": live_feed.watermark,
+            })
+            while not subscription.closed:
+                try:
+                    batch = await asyncio.wait_for(subscription.queue.get(), timeout=LIVE_FEED_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if batch is None:
+                    break
+                yield _sse("sensors", {"sensors": batch, "watermark": live_feed.watermark})
+        finally:
+            live_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _load_cure_results(
+    service: SnowflakeService,
+    format: ResponseFormat = "rows",
+    page_size: int = 100,
+    cursor: Optional[str] = None,
+    asset_id: Optional[str] = None,
+    version: Optional[DataVersion] = None,
+) -> Dict[str, Any]:
+    # Null CURE_TIMESTAMPs sort last, as in _load_anomaly_events.
+    after_timestamp, after_batch = _decode_cursor(cursor)
+    result = await service.execute_query_swr(
+        """
+        SELECT 
+            BATCH_ID,
+            AUTOCLAVE_ID,
+            CURE_TIMESTAMP,
+            LAYUP_HUMIDITY_AVG,
+            LAYUP_HUMIDITY_PEAK,
+            SCRAP_FLAG,
+            DELAMINATION_SCORE,
+            FAILURE_MODE
+        FROM SNOWCORE_PDM.PDM.CURE_RESULTS
+        WHERE (%(asset_id)s IS NULL OR AUTOCLAVE_ID = %(asset_id)s)
+          AND (%(after_batch)s IS NULL
+               OR CURE_TIMESTAMP < %(after_timestamp)s
+               OR (CURE_TIMESTAMP = %(after_timestamp)s AND BATCH_ID < %(after_batch)s)
+               OR (CURE_TIMESTAMP IS NULL AND (%(after_timestamp)s IS NOT NULL OR BATCH_ID < %(after_batch)s)))
+        ORDER BY CURE_TIMESTAMP DESC NULLS LAST, BATCH_ID DESC
+        LIMIT %(limit)s
+        """,
+        params={
+            "asset_id": asset_id,
+            "after_timestamp": after_timestamp,
+            "after_batch": after_batch,
+            "limit": page_size + 1,
+        },
+        timeout=30,
+        columnar=format == "columnar",
+        ttl=CACHE_TTLS["cure-results"],
+        max_stale=MAX_STALE_SECONDS,
+        version=version,
+    )
+    results, next_cursor = _paged(result.value, page_size, "CURE_TIMESTAMP", "BATCH_ID")
+    return {"results": results, "next_cursor": next_cursor, **_freshness(result)}
+
+
+@app.get("/api/cure-results", dependencies=[Depends(ROUTE_LIMITS["cure-results"])])
+async def get_cure_results(
+    request: Request,
+    format: ResponseFormat = Query("rows"),
+    page_size: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    asset_id: Optional[str] = Query(None, description="Autoclave asset id"),
+):
     service = get_snowflake_service()
+    # Decoded up front so a bad cursor is a 400 rather than a 500.
+    _decode_cursor(cursor)
+    version = await _data_version(service, "SNOWCORE_PDM.PDM.CURE_RESULTS")
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        data = service.execute_query(
-            """
-            SELECT 
-                BATCH_ID,
-                AUTOCLAVE_ID,
-                CURE_TIMESTAMP,
-                LAYUP_HUMIDITY_AVG,
-                LAYUP_HUMIDITY_PEAK,
-                SCRAP_FLAG,
-                DELAMINATION_SCORE,
-                FAILURE_MODE
-            FROM SNOWCORE_PDM.PDM.CURE_RESULTS
-            ORDER BY CURE_TIMESTAMP DESC
-            LIMIT 100
-            """,
-            timeout=30,
-        )
-        return {"results": data}
+        content = await _load_cure_results(service, format, page_size, cursor, asset_id, version)
+        return _versioned(content, version)
     except Exception as e:
         logger.error(f"Failed to fetch cure results: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch cure results")
 
 
-@app.get("/api/gnn-propagation")
-async def get_gnn_propagation():
-    service = get_snowflake_service()
+async def _latest_gnn_run(
+    service: SnowflakeService,
+    version: Optional[DataVersion] = None,
+) -> Tuple[Optional[Any], bool]:
+    """``(RUN_TIMESTAMP of the newest GNN run, whether it may predate version)``.
+
+    Read from the GNN_LATEST_RUN index table, falling back to a MAX over the scores.
+    """
     try:
-        data = service.execute_query(
-            """
-            SELECT 
-                SOURCE_ASSET,
-                TARGET_ASSET,
-                PROPAGATION_SCORE,
-                PROPAGATION_TYPE,
-                EDGE_TYPE,
-                HOP_DISTANCE,
-                CONFIDENCE
-            FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES
-            WHERE RUN_TIMESTAMP = (SELECT MAX(RUN_TIMESTAMP) FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES)
-            ORDER BY PROPAGATION_SCORE DESC
-            """,
-            timeout=30,
-        )
-        nodes_data = service.execute_query(
-            """
-            SELECT SOURCE_ASSET AS ASSET, MAX(CONFIDENCE) AS SCORE
-            FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES
-            WHERE RUN_TIMESTAMP = (SELECT MAX(RUN_TIMESTAMP) FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES)
-            GROUP BY SOURCE_ASSET
-            ORDER BY SOURCE_ASSET
-            """,
-            timeout=30,
+        result = await service.execute_query_swr(
+            "SELECT MAX(RUN_TIMESTAMP) AS RUN_TIMESTAMP FROM SNOWCORE_PDM.PDM.GNN_LATEST_RUN",
+            timeout=10,
+            ttl=CACHE_TTLS["gnn-latest-run"],
+            max_stale=MAX_STALE_SECONDS,
+            version=version,
         )
-        return {"propagation": data, "nodes": nodes_data}
+        rows = result.value
+        if rows and rows[0]["RUN_TIMESTAMP"] is not None:
+            return rows[0]["RUN_TIMESTAMP"], result.stale
+    except Exception as e:
+        logger.warning(f"GNN_LATEST_RUN unavailable, falling back to MAX(RUN_TIMESTAMP): {e}")
+    rows = await service.execute_query_cached(
+        "SELECT MAX(RUN_TIMESTAMP) AS RUN_TIMESTAMP FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES",
+        timeout=30,
+        ttl=CACHE_TTLS["gnn-latest-run"],
+    )
+    return (rows[0]["RUN_TIMESTAMP"] if rows else None), version is not None
+
+
+async def _load_gnn_propagation(service: SnowflakeService, version: Optional[DataVersion] = None) -> Dict[str, Any]:
+    run_timestamp, run_stale = await _latest_gnn_run(service, version)
+    if run_timestamp is None:
+        return {"propagation": [], "nodes": []}
+    # The run timestamp is part of the cache key, so a new run is picked up as
+    # soon as the index changes and older entries simply age out.
+    result = await service.execute_query_swr(
+        """
+        SELECT 
+            SOURCE_ASSET,
+            TARGET_ASSET,
+            PROPAGATION_SCORE,
+            PROPAGATION_TYPE,
+            EDGE_TYPE,
+            HOP_DISTANCE,
+            CONFIDENCE
+        FROM SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES
+        WHERE RUN_TIMESTAMP = %(run_timestamp)s
+        ORDER BY PROPAGATION_SCORE DESC
+        """,
+        params={"run_timestamp": run_timestamp},
+        timeout=30,
+        ttl=CACHE_TTLS["gnn-propagation"],
+        max_stale=MAX_STALE_SECONDS,
+        version=version,
+    )
+    data = result.value
+    scores: Dict[str, Any] = {}
+    for row in data:
+        confidence = row["CONFIDENCE"]
+        current = scores.get(row["SOURCE_ASSET"])
+        if current is None or (confidence is not None and confidence > current):
+            scores[row["SOURCE_ASSET"]] = confidence
+    nodes_data = [{"ASSET": asset, "SCORE": scores[asset]} for asset in sorted(scores)]
+    return {"propagation": data, "nodes": nodes_data, **_freshness(result), "stale": result.stale or run_stale}
+
+
+# The notebook writes the scores and then the latest-run index, and the response
+# depends on both, so the version does too: a poll between the two writes must
+# not cache the previous run under the new scores' version.
+GNN_VERSION_TABLES = ("SNOWCORE_PDM.PDM.GNN_PROPAGATION_SCORES", "SNOWCORE_PDM.PDM.GNN_LATEST_RUN")
+
+
+@app.get("/api/gnn-propagation", dependencies=[Depends(ROUTE_LIMITS["gnn-propagation"])])
+async def get_gnn_propagation(request: Request):
+    service = get_snowflake_service()
+    version = await _data_version(service, *GNN_VERSION_TABLES)
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
+    try:
+        return _versioned(await _load_gnn_propagation(service, version), version)
     except Exception as e:
         logger.error(f"Failed to fetch GNN propagation: {e}")
         return {"propagation": [], "nodes": []}
 
 
-@app.get("/api/task-status")
+async def _load_task_status(service: SnowflakeService) -> Dict[str, Any]:
+    data = await service.execute_query_async(
+        """
+        SHOW TASKS IN SCHEMA SNOWCORE_PDM.PDM
+        """,
+        timeout=10,
+    )
+    tasks = []
+    for row in data:
+        tasks.append({
+            "name": row.get("name"),
+            "state": row.get("state"),
+            "schedule": row.get("schedule"),
+            "warehouse": row.get("warehouse"),
+            "last_run": None,
+        })
+    return {"tasks": tasks}
+
+
+@app.get("/api/task-status", dependencies=[Depends(ROUTE_LIMITS["task-status"])])
 async def get_task_status():
     service = get_snowflake_service()
     try:
-        data = service.execute_query(
-            """
-            SHOW TASKS IN SCHEMA SNOWCORE_PDM.PDM
-            """,
-            timeout=10,
-        )
-        tasks = []
-        for row in data:
-            tasks.append({
-                "name": row.get("name"),
-                "state": row.get("state"),
-                "schedule": row.get("schedule"),
-                "warehouse": row.get("warehouse"),
-                "last_run": None,
-            })
-        return {"tasks": tasks}
+        return await _load_task_status(service)
     except Exception as e:
         logger.error(f"Failed to fetch task status: {e}")
         return {"tasks": []}
 
 
-@app.get("/api/anomaly-triggers")
-async def get_anomaly_triggers():
+async def _load_anomaly_triggers(service: SnowflakeService) -> Dict[str, Any]:
+    data = await service.execute_query_async(
+        """
+        SELECT 
+            ASSET_ID,
+            TRIGGER_ACTIVE,
+            TRIGGERED_AT,
+            TRIGGERED_BY
+        FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS
+        ORDER BY ASSET_ID
+        """,
+        timeout=10,
+    )
+    triggers = [
+        {
+            "asset_id": row["ASSET_ID"],
+            "trigger_active": row["TRIGGER_ACTIVE"],
+            "triggered_at": str(row["TRIGGERED_AT"]) if row["TRIGGERED_AT"] else None,
+            "triggered_by": row["TRIGGERED_BY"],
+        }
+        for row in data
+    ]
+    return {"triggers": triggers}
+
+
+@app.get("/api/anomaly-triggers", dependencies=[Depends(ROUTE_LIMITS["anomaly-triggers"])])
+async def get_anomaly_triggers(request: Request):
     service = get_snowflake_service()
+    version = await _data_version(service, "SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS")
+    not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
     try:
-        data = service.execute_query(
-            """
-            SELECT 
-                ASSET_ID,
-                TRIGGER_ACTIVE,
-                TRIGGERED_AT,
-                TRIGGERED_BY
-            FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS
-            ORDER BY ASSET_ID
-            """,
-            timeout=10,
-        )
-        triggers = [
-            {
-                "asset_id": row["ASSET_ID"],
-                "trigger_active": row["TRIGGER_ACTIVE"],
-                "triggered_at": str(row["TRIGGERED_AT"]) if row["TRIGGERED_AT"] else None,
-                "triggered_by": row["TRIGGERED_BY"],
-            }
-            for row in data
-        ]
-        return {"triggers": triggers}
+        return _versioned(await _load_anomaly_triggers(service), version)
     except Exception as e:
         logger.error(f"Failed to fetch anomaly triggers: {e}")
         return {"triggers": []}
 
 
-@app.post("/api/toggle-simulation")
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_SECTIONS = {
+    "decisions": _load_decisions,
+    "anomalies": _load_anomaly_events,
+    "propagation": _load_gnn_propagation,
+    "triggers": _load_anomaly_triggers,
+    "tasks": _load_task_status,
+}
+
+
+@app.get("/api/snapshot", dependencies=[Depends(ROUTE_LIMITS["snapshot"])])
+async def get_snapshot():
+    """Landing-view data in one round trip.
+
+    Sections are loaded concurrently. Each reports its own timing, and a failed
+    section carries an error instead of failing the whole payload.
+    """
+    service = get_snowflake_service()
+
+    async def load(name, loader):
+        start = time.perf_counter()
+        try:
+            section = {"ok": True, **await loader(service)}
+        except Exception as e:
+            logger.error(f"Snapshot section {name} failed: {e}")
+            section = {"ok": False, "error": str(e)}
+        section["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return name, section
+
+    start = time.perf_counter()
+    sections = await asyncio.gather(*(load(name, loader) for name, loader in SNAPSHOT_SECTIONS.items()))
+    return {
+        "version": SNAPSHOT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "sections": dict(sections),
+    }
+
+
+async def _prime_caches() -> Dict[str, Any]:
+    """Load the dashboard's cached reads once, tagged with the current data versions.
+
+    Entries are stored under the same keys and versions the endpoints use with
+    their default parameters, so the first polls after a deploy are cache hits.
+    """
+    service = get_snowflake_service()
+
+    async def version(*tables: str) -> Optional[DataVersion]:
+        return await _data_version(service, *(f"SNOWCORE_PDM.PDM.{table}" for table in tables))
+
+    loads = {
+        "decisions": _load_decisions(service),
+        "failure-probability": _load_failure_probability(service, version=await version("FAILURE_PROBABILITY")),
+        "anomaly-events": _load_anomaly_events(service, version=await version("ANOMALY_EVENTS")),
+        "cure-results": _load_cure_results(service, version=await version("CURE_RESULTS")),
+        "gnn-propagation": _load_gnn_propagation(service, version=await version("GNN_PROPAGATION_SCORES", "GNN_LATEST_RUN")),
+    }
+    results = await asyncio.gather(*loads.values(), return_exceptions=True)
+    failed = {name: str(result) for name, result in zip(loads, results) if isinstance(result, Exception)}
+    if failed:
+        raise RuntimeError(f"could not prime {', '.join(failed)}: {'; '.join(failed.values())}")
+    return {"primed": list(loads)}
+
+
+# Optional warm start. Instead of the first requests after a deploy paying for
+# connection setup, authentication and a cold warehouse, these phases run
+# concurrently in the background at startup; /ready turns 200 once they finish.
+WARM_START = os.getenv("WARM_START", "false").lower() in ("1", "true", "yes")
+warm_up = WarmUp({
+    "connections": lambda: get_snowflake_service().prewarm_connections(),
+    "agent_token": lambda: get_snowflake_service().prewarm_agent(),
+    "caches": _prime_caches,
+})
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the warm start has finished. ``/`` stays the liveness check."""
+    status = warm_up.stats()
+    return FastJSONResponse(
+        {"status": "ready" if status["ready"] else "warming", **status},
+        status_code=200 if status["ready"] else 503,
+    )
+
+
+# Long-running analyses, run as asynchronous Snowflake queries. Clients submit
+# by name, poll the job, then stream the results; only predefined SQL can run.
+ANALYSES = {
+    "sensor-history-90d": {
+        "description": "90 days of pivoted sensor readings from ASSET_SENSORS_WIDE, optionally for one asset",
+        "sql": """
+            SELECT *
+            FROM SNOWCORE_PDM.ATOMIC.ASSET_SENSORS_WIDE
+            WHERE EVENT_TIMESTAMP > DATEADD('day', -90, CURRENT_TIMESTAMP())
+              AND (%(asset_id)s IS NULL OR ASSET_ID = %(asset_id)s)
+            ORDER BY ASSET_ID, EVENT_TIMESTAMP
+        """,
+    },
+    "humidity-scrap-correlation": {
+        "description": "Scrap and delamination rates by layup humidity band over all cure batches",
+        "sql": """
+            SELECT
+                WIDTH_BUCKET(LAYUP_HUMIDITY_PEAK, 40, 80, 8) AS HUMIDITY_BAND,
+                MIN(LAYUP_HUMIDITY_PEAK) AS HUMIDITY_MIN,
+                MAX(LAYUP_HUMIDITY_PEAK) AS HUMIDITY_MAX,
+                COUNT(*) AS BATCHES,
+                SUM(IFF(SCRAP_FLAG, 1, 0)) AS SCRAP_COUNT,
+                ROUND(AVG(IFF(SCRAP_FLAG, 1, 0)) * 100, 1) AS SCRAP_RATE_PCT,
+                AVG(DELAMINATION_SCORE) AS AVG_DELAMINATION_SCORE,
+                CORR(LAYUP_HUMIDITY_PEAK, DELAMINATION_SCORE) AS HUMIDITY_DELAMINATION_CORR
+            FROM SNOWCORE_PDM.PDM.CURE_RESULTS
+            GROUP BY HUMIDITY_BAND
+            ORDER BY HUMIDITY_BAND
+        """,
+    },
+}
+JOB_TIMEOUT_SECONDS = int(os.getenv("JOB_TIMEOUT_SECONDS", "1800"))
+JOB_PAGE_SIZE = 1000
+jobs = JobStore(max_jobs=int(os.getenv("JOB_MAX_TRACKED", "200")))
+
+
+async def _refresh_job(service: SnowflakeService, job: Job) -> Job:
+    if job.state == "running":
+        job.update(*await service.query_status_async(job.sfqid))
+    return job
+
+
+def _get_job(job_id: str) -> Job:
+    try:
+        return jobs.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/jobs/analyses")
+async def list_analyses():
+    return {"analyses": [{"name": name, "description": spec["description"]} for name, spec in ANALYSES.items()]}
+
+
+@app.post("/api/jobs", status_code=202, dependencies=[Depends(ROUTE_LIMITS["jobs"])])
+async def submit_job(request: JobRequest):
+    spec = ANALYSES.get(request.analysis)
+    if spec is None:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis {request.analysis!r}")
+    params = {"asset_id": request.asset_id} if "%(asset_id)s" in spec["sql"] else None
+    service = get_snowflake_service()
+    try:
+        sfqid = await service.submit_query_async(spec["sql"], params, JOB_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to submit {request.analysis} job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit job")
+    job = jobs.add(Job(request.analysis, sfqid, params))
+    logger.info(f"Submitted {request.analysis} job {job.job_id} as query {sfqid}")
+    return job.to_dict()
+
+
+@app.get("/api/jobs", dependencies=[Depends(ROUTE_LIMITS["jobs"])])
+async def list_jobs():
+    return {"jobs": [job.to_dict() for job in jobs.list()]}
+
+
+@app.get("/api/jobs/{job_id}", dependencies=[Depends(ROUTE_LIMITS["jobs"])])
+async def get_job(job_id: str):
+    job = _get_job(job_id)
+    try:
+        await _refresh_job(get_snowflake_service(), job)
+    except Exception as e:
+        logger.error(f"Failed to check job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check job status")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_job_results(request: Request, job_id: str, page_size: int = Query(JOB_PAGE_SIZE, ge=1, le=10000)):
+    """Stream a finished job's rows as NDJSON, fetched from Snowflake ``page_size`` rows at a time.
+
+    Returns 409 while the job is still running and 422 if it failed.
+    """
+    job = _get_job(job_id)
+    service = get_snowflake_service()
+    try:
+        await _refresh_job(service, job)
+    except Exception as e:
+        logger.error(f"Failed to check job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check job status")
+    if job.state == "running":
+        raise HTTPException(status_code=409, detail="Job is still running", headers={"Retry-After": "5"})
+    if job.state == "failed":
+        raise HTTPException(status_code=422, detail=job.error or f"Job ended with status {job.status}")
+
+    async def ndjson():
+        # Slot taken inside the stream, like /api/chat/stream.
+        try:
+            async with ROUTE_LIMITS["job-results"].slot():
+                async with aclosing(service.iter_query_results(job.sfqid, page_size)) as pages:
+                    async for page in pages:
+                        if await request.is_disconnected():
+                            logger.info(f"Job {job_id} results client disconnected")
+                            return
+                        yield b"".join(dumps(row) + b"\n" for row in page)
+        except ConcurrencyLimitError as e:
+            yield dumps({"error": str(e)}) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+# Control statements. The trigger change is a single UPDATE (atomic on its own),
+# and the task ALTERs, which are DDL and cannot share a transaction, are issued
+# concurrently and undone if any fails. Starting the simulation adds a second
+# round trip for the backfill; see toggle_simulation.
+SIMULATION_TASKS = [
+    "SNOWCORE_PDM.PDM.SENSOR_GENERATION_TASK",
+    "SNOWCORE_PDM.PDM.SENSOR_CLEANUP_TASK",
+]
+SIMULATION_BACKFILL_SQL = """
+    INSERT INTO SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE (RECORD_METADATA, RECORD_CONTENT, INGESTION_TIME)
+    SELECT RECORD_METADATA, RECORD_CONTENT, INGESTION_TIME 
+    FROM TABLE(SNOWCORE_PDM.PDM.GENERATE_SENSOR_READINGS(
+        60, 
+        COALESCE((SELECT LISTAGG(ASSET_ID, ',') FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS WHERE TRIGGER_ACTIVE = TRUE), ''::VARCHAR)
+    ))
+"""
+# Activates exactly the assets in the JSON array %(asset_ids)s and clears every
+# other active trigger. An empty array clears them all.
+SET_TRIGGERS_SQL = """
+    UPDATE SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS t
+    SET TRIGGER_ACTIVE = s.ACTIVE,
+        TRIGGERED_AT = IFF(s.ACTIVE, CURRENT_TIMESTAMP(), t.TRIGGERED_AT),
+        TRIGGERED_BY = IFF(s.ACTIVE, %(triggered_by)s, t.TRIGGERED_BY)
+    FROM (
+        SELECT ASSET_ID, ARRAY_CONTAINS(ASSET_ID::VARIANT, PARSE_JSON(%(asset_ids)s)) AS ACTIVE
+        FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS
+    ) s
+    WHERE t.ASSET_ID = s.ASSET_ID
+      AND (t.TRIGGER_ACTIVE OR s.ACTIVE)
+"""
+# Which of the requested assets have a trigger row, i.e. which ones
+# SET_TRIGGERS_SQL activates. Run alongside it: the UPDATE never changes the
+# set of ASSET_IDs, so the two statements cannot disagree.
+KNOWN_TRIGGERS_SQL = """
+    SELECT ASSET_ID
+    FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS
+    WHERE ARRAY_CONTAINS(ASSET_ID::VARIANT, PARSE_JSON(%(asset_ids)s))
+"""
+MAX_INJECT_ASSETS = 20
+
+
+async def _alter_tasks(service: SnowflakeService, tasks: List[str], action: str):
+    """``ALTER TASK ... <action>`` on every task concurrently; tasks already changed are reverted if one fails."""
+    results = await asyncio.gather(
+        *(service.execute_query_async(f"ALTER TASK {task} {action}", timeout=10) for task in tasks),
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if not errors:
+        return
+    undo = "SUSPEND" if action == "RESUME" else "RESUME"
+    changed = [task for task, result in zip(tasks, results) if not isinstance(result, Exception)]
+    reverted = await asyncio.gather(
+        *(service.execute_query_async(f"ALTER TASK {task} {undo}", timeout=10) for task in changed),
+        return_exceptions=True,
+    )
+    for task, result in zip(changed, reverted):
+        if isinstance(result, Exception):
+            logger.error(f"Could not revert {task} to {undo}: {result}")
+    raise errors[0]
+
+
+@app.post("/api/toggle-simulation", dependencies=[Depends(ROUTE_LIMITS["toggle-simulation"])])
 async def toggle_simulation(request: ToggleSimulationRequest):
+    """Resume or suspend the simulation tasks; starting them also backfills a minute of readings.
+
+    Starting takes two round trips on purpose. The backfill INSERT waits for
+    the concurrent ALTERs because it must not run when a resume fails and is
+    reverted. It cannot join them in one multi-statement request either: each
+    ALTER TASK commits on its own, so a failure would stop the batch part-way
+    without saying which tasks were already resumed, and the ALTERs would run
+    one after another instead of concurrently.
+    """
     service = get_snowflake_service()
+    action = "RESUME" if request.enable else "SUSPEND"
     try:
-        action = "RESUME" if request.enable else "SUSPEND"
-        service.execute_query(
-            f"ALTER TASK SNOWCORE_PDM.PDM.SENSOR_GENERATION_TASK {action}",
-            timeout=10,
-        )
-        service.execute_query(
-            f"ALTER TASK SNOWCORE_PDM.PDM.SENSOR_CLEANUP_TASK {action}",
-            timeout=10,
-        )
-        if request.enable:
-            service.execute_query(
-                """
-                INSERT INTO SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE (RECORD_METADATA, RECORD_CONTENT, INGESTION_TIME)
-                SELECT RECORD_METADATA, RECORD_CONTENT, INGESTION_TIME 
-                FROM TABLE(SNOWCORE_PDM.PDM.GENERATE_SENSOR_READINGS(
-                    60, 
-                    COALESCE((SELECT ASSET_ID FROM SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS WHERE TRIGGER_ACTIVE = TRUE LIMIT 1), ''::VARCHAR)
-                ))
-                """,
-                timeout=30,
-            )
-        return {"success": True, "state": "started" if request.enable else "suspended"}
+        await _alter_tasks(service, SIMULATION_TASKS, action)
     except Exception as e:
         logger.error(f"Failed to toggle simulation: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to toggle simulation: {str(e)}")
+    response = {"success": True, "state": "started" if request.enable else "suspended"}
+    if request.enable:
+        # Only once the tasks are running, so a failed toggle leaves no rows behind.
+        try:
+            await service.execute_query_async(SIMULATION_BACKFILL_SQL, timeout=30)
+            response["backfilled"] = True
+        except Exception as e:
+            # The tasks are running and fill the table within a minute anyway.
+            logger.warning(f"Simulation started but the initial backfill failed: {e}")
+            response["backfilled"] = False
+    return response
 
 
-@app.post("/api/inject-anomaly")
+@app.post("/api/inject-anomaly", dependencies=[Depends(ROUTE_LIMITS["inject-anomaly"])])
 async def inject_anomaly(request: InjectAnomalyRequest):
+    """Set the active anomaly triggers to ``asset_id`` plus ``asset_ids``; an empty request clears them all."""
+    asset_ids = sorted({*request.asset_ids, *([request.asset_id] if request.asset_id else [])})
+    if len(asset_ids) > MAX_INJECT_ASSETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_INJECT_ASSETS} assets can be triggered at once")
     service = get_snowflake_service()
+    params = {"asset_ids": json.dumps(asset_ids), "triggered_by": "REACT_DASHBOARD"}
     try:
-        service.execute_query(
-            "UPDATE SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS SET TRIGGER_ACTIVE = FALSE",
-            timeout=10,
-        )
-        if request.asset_id:
-            service.execute_query(
-                f"""
-                UPDATE SNOWCORE_PDM.CONFIG.ANOMALY_TRIGGERS
-                SET TRIGGER_ACTIVE = TRUE,
-                    TRIGGERED_AT = CURRENT_TIMESTAMP(),
-                    TRIGGERED_BY = 'REACT_DASHBOARD'
-                WHERE ASSET_ID = '{request.asset_id}'
-                """,
-                timeout=10,
+        update = service.execute_query_async(SET_TRIGGERS_SQL, params=params, timeout=10)
+        if asset_ids:
+            _, known = await asyncio.gather(
+                update, service.execute_query_async(KNOWN_TRIGGERS_SQL, params=params, timeout=10)
             )
-        return {"success": True, "asset_id": request.asset_id}
+        else:
+            await update
+            known = []
+        # Let the next trigger poll see the change instead of a cached version token.
+        service.invalidate_cached(data_versions.query)
+        # Unknown asset ids have no trigger row and were not activated.
+        activated = sorted(row["ASSET_ID"] for row in known)
+        asset_id = request.asset_id if request.asset_id in activated else None
+        return {"success": True, "asset_id": asset_id, "asset_ids": activated}
     except Exception as e:
         logger.error(f"Failed to inject anomaly: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to inject anomaly: {str(e)}")
 
 
-@app.post("/api/chat", response_model=ChatResponse)
+@app.post("/api/chat", response_model=ChatResponse, dependencies=[Depends(ROUTE_LIMITS["chat"])])
 async def chat(message: ChatMessage):
     service = get_snowflake_service()
 
     try:
-        result = service.call_cortex_agent(message.message)
+        result, cached = await service.call_cortex_agent_cached(
+            message.message, bypass_cache=message.bypass_cache
+        )
 
         return ChatResponse(
             response=result.get("response", "I couldn't process that request."),
             sources=result.get("sources", []),
             tool_calls=result.get("tool_calls", []),
+            context={"cached": cached},
         )
 
     except Exception as e:
@@ -423,6 +1362,77 @@ async def chat(message: ChatMessage):
         )
 
 
+# Longest streamed answer, in bytes of text, that is kept for the answer cache.
+MAX_CACHED_ANSWER_BYTES = int(os.getenv("ANSWER_CACHE_MAX_ANSWER_BYTES", "65536"))
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage, request: Request):
+    """Relay Cortex Agent events to the browser as Server-Sent Events as they arrive.
+
+    Emits ``response.text.delta``, ``response.tool_use`` and ``response.tool_result``
+    events, then ``done`` (or ``error``).
+    """
+    service = get_snowflake_service()
+
+    async def event_source():
+        # The slot is taken inside the stream, not in the handler, so it is held
+        # only while the body is actually running and is released however the
+        # stream ends; a response that is never iterated never takes one.
+        try:
+            async with ROUTE_LIMITS["chat-stream"].slot():
+                cached, fingerprint = await service.get_cached_answer(message.message)
+                if cached is not None and not message.bypass_cache:
+                    yield _sse("response.text.delta", {"text": cached["response"]})
+                    for tool_call in cached["tool_calls"]:
+                        yield _sse("response.tool_use", tool_call)
+                    if cached["sources"]:
+                        yield _sse("response.tool_result", {"sources": cached["sources"]})
+                    yield _sse("done", {"cached": True})
+                    return
+
+                # Collected only for the answer cache: text chunks are joined once
+                # at the end, and an answer longer than MAX_CACHED_ANSWER_BYTES is
+                # dropped rather than held, so the stream stays in bounded memory.
+                answer: Optional[Dict[str, Any]] = {"response": [], "tool_calls": [], "sources": []}
+                answer_bytes = 0
+                async with aclosing(service.stream_cortex_agent(message.message)) as events:
+                    async for event_type, data in events:
+                        if await request.is_disconnected():
+                            logger.info("Chat stream client disconnected")
+                            return
+                        if answer is not None:
+                            if event_type == "response.text.delta":
+                                answer_bytes += len(data["text"].encode("utf-8"))
+                                if answer_bytes > MAX_CACHED_ANSWER_BYTES:
+                                    logger.info(f"Chat answer exceeds {MAX_CACHED_ANSWER_BYTES} bytes; not caching")
+                                    answer = None
+                                else:
+                                    answer["response"].append(data["text"])
+                            elif event_type == "response.tool_use":
+                                answer["tool_calls"].append(data)
+                            elif event_type == "response.tool_result":
+                                answer["sources"].extend(data["sources"])
+                            elif event_type == "error":
+                                answer["error"] = data["message"]
+                        yield _sse(event_type, data)
+                if answer is not None:
+                    answer["response"] = "".join(answer["response"])
+                    service.store_answer(message.message, fingerprint, answer)
+                yield _sse("done", {"cached": False})
+        except ConcurrencyLimitError as e:
+            yield _sse("error", {"message": str(e)})
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse("error", {"message": f"I encountered an error connecting to the Cortex Agent: {str(e)}"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,353 @@
+"""Drive the API with simulated dashboard viewers and record latency, throughput and memory per viewer count.
+
+Each viewer behaves like an open browser tab: a 1 Hz live-sensor poll that
+passes back its ``watermark``, a 5 s poll of the dashboard endpoints that
+revalidates with ``If-None-Match`` like SWR does, and an occasional Copilot
+question. Polls are closed-loop, as in SWR: the next one is scheduled an
+interval after the previous response, so a slow API also lowers throughput.
+
+By default the app runs in-process on the local DuckDB backend
+(``SNOWFLAKE_BACKEND=local``) with ``LOCAL_QUERY_LATENCY_MS`` of simulated
+Snowflake round trip, so runs need no account and are repeatable. Client and
+server then share one event loop, which is the same constraint as a single
+uvicorn worker. Pass ``--url`` to drive a running server instead; memory is
+then not measured.
+
+Run from react/backend:
+
+    python -m benchmarks.load_test [--viewers 1,10,100,1000] [--duration 60] [--latency-ms 150]
+        [--output load_test.json] [--baseline previous.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+LIVE_INTERVAL_SECONDS = 1.0
+DASHBOARD_INTERVAL_SECONDS = 5.0
+# What Telemetry.tsx, TaskControls.tsx and Dashboard.tsx poll.
+DASHBOARD_PATHS = [
+    "/api/decisions",
+    "/api/anomaly-events",
+    "/api/cure-results",
+    "/api/task-status",
+    "/api/anomaly-triggers",
+]
+CHAT_QUESTIONS = [
+    "Which assets need maintenance this shift?",
+    "Why is AUTOCLAVE_01 at risk?",
+    "What is driving scrap on the cure line?",
+    "Summarize today's anomalies.",
+]
+
+
+class Recorder:
+    """Per-route latency samples and outcome counts for one run."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, route: str, ms: float, outcome: str):
+        if not self.recording:
+            return
+        self.latencies[route].append(ms)
+        self.counts[route][outcome] += 1
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    if len(samples) == 1:
+        value = round(samples[0], 1)
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value, "max_ms": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 1),
+        "p95_ms": round(cuts[94], 1),
+        "p99_ms": round(cuts[98], 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+async def request(client: httpx.AsyncClient, recorder: Recorder, route: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        recorder.record(route, (time.perf_counter() - started) * 1000, type(e).__name__)
+        return None
+    elapsed = (time.perf_counter() - started) * 1000
+    recorder.record(route, elapsed, "304" if response.status_code == 304 else str(response.status_code // 100) + "xx")
+    return response
+
+
+async def live_poller(client: httpx.AsyncClient, recorder: Recorder, stop: asyncio.Event):
+    watermark = None
+    while not stop.is_set():
+        params = {"since": watermark} if watermark else None
+        response = await request(client, recorder, "/api/live-sensors-by-asset", "GET",
+                                 "/api/live-sensors-by-asset", params=params)
+        if response is not None and response.status_code == 200:
+            watermark = response.json().get("watermark") or watermark
+        await sleep_or_stop(stop, LIVE_INTERVAL_SECONDS)
+
+
+async def dashboard_poller(client: httpx.AsyncClient, recorder: Recorder, stop: asyncio.Event):
+    etags: Dict[str, str] = {}
+
+    async def poll(path: str):
+        headers = {"If-None-Match": etags[path]} if path in etags else None
+        response = await request(client, recorder, path, "GET", path, headers=headers)
+        if response is not None and response.status_code == 200 and "etag" in response.headers:
+            etags[path] = response.headers["etag"]
+
+    while not stop.is_set():
+        await asyncio.gather(*(poll(path) for path in DASHBOARD_PATHS))
+        await sleep_or_stop(stop, DASHBOARD_INTERVAL_SECONDS)
+
+
+async def chatter(client: httpx.AsyncClient, recorder: Recorder, stop: asyncio.Event, mean_interval: float):
+    while not stop.is_set():
+        if await sleep_or_stop(stop, random.expovariate(1 / mean_interval)):
+            return
+        await request(client, recorder, "/api/chat/stream", "POST", "/api/chat/stream",
+                      json={"message": random.choice(CHAT_QUESTIONS)})
+
+
+async def sleep_or_stop(stop: asyncio.Event, seconds: float) -> bool:
+    """Sleep up to ``seconds``; True if ``stop`` was set meanwhile."""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def viewer(client: httpx.AsyncClient, recorder: Recorder, stop: asyncio.Event, args):
+    # Stagger tab openings over one dashboard interval instead of a thundering herd.
+    if await sleep_or_stop(stop, random.uniform(0, DASHBOARD_INTERVAL_SECONDS)):
+        return
+    tasks = [live_poller(client, recorder, stop), dashboard_poller(client, recorder, stop)]
+    if args.chat_interval > 0:
+        tasks.append(chatter(client, recorder, stop, args.chat_interval))
+    await asyncio.gather(*tasks)
+
+
+async def backend_queries(client: httpx.AsyncClient) -> Optional[int]:
+    try:
+        response = await client.get("/api/debug/stats")
+        return response.json()["queries"]["queries"]
+    except (httpx.HTTPError, KeyError, ValueError):
+        return None
+
+
+async def run(client: httpx.AsyncClient, viewers: int, args, in_process: bool) -> Dict[str, Any]:
+    recorder = Recorder()
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(viewer(client, recorder, stop, args)) for _ in range(viewers)]
+    await asyncio.sleep(args.warmup)
+
+    memory_samples = []
+
+    async def sample_memory():
+        while not stop.is_set():
+            memory_samples.append(rss_mb())
+            await sleep_or_stop(stop, 0.5)
+
+    queries_before = await backend_queries(client)
+    recorder.recording = True
+    sampler = asyncio.create_task(sample_memory()) if in_process else None
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    recorder.recording = False
+    elapsed = time.perf_counter() - started
+    queries_after = await backend_queries(client)
+    stop.set()
+    await asyncio.gather(*tasks, *([sampler] if sampler else []))
+
+    routes = {}
+    all_samples: List[float] = []
+    total = errors = not_modified = 0
+    for route, samples in sorted(recorder.latencies.items()):
+        counts = dict(recorder.counts[route])
+        route_errors = sum(n for outcome, n in counts.items() if outcome not in ("2xx", "304"))
+        routes[route] = {
+            "requests": len(samples),
+            "errors": route_errors,
+            "not_modified": counts.get("304", 0),
+            "outcomes": counts,
+            **percentiles(samples),
+        }
+        all_samples.extend(samples)
+        total += len(samples)
+        errors += route_errors
+        not_modified += counts.get("304", 0)
+    queries = queries_after - queries_before if queries_before is not None and queries_after is not None else None
+    memory = [sample for sample in memory_samples if sample is not None]
+    return {
+        "viewers": viewers,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else None,
+        "not_modified": not_modified,
+        "backend_queries": queries,
+        "backend_queries_per_request": round(queries / total, 3) if queries is not None and total else None,
+        **percentiles(all_samples),
+        "memory": {
+            "rss_mean_mb": round(statistics.mean(memory), 1) if memory else None,
+            "rss_max_mb": round(max(memory), 1) if memory else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1) if in_process else None,
+        },
+        "routes": routes,
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*command: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *command], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def compare(results: Dict[str, Any], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {entry["viewers"]: entry for entry in baseline["runs"]}
+    commit = (baseline.get("git") or {}).get("commit") or "?"
+    print(f"\nvs {baseline_path} ({commit[:10]})")
+    for entry in results["runs"]:
+        before = previous.get(entry["viewers"])
+        if before is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "backend_queries_per_request"):
+            if entry.get(key) is None or not before.get(key):
+                continue
+            cells.append(f"{key} {before[key]} -> {entry[key]} ({(entry[key] / before[key] - 1) * 100:+.0f}%)")
+        print(f"  {entry['viewers']:>5} viewers: " + ", ".join(cells))
+
+
+async def main_async(args) -> Dict[str, Any]:
+    viewer_counts = [int(count) for count in args.viewers.split(",")]
+    limits = httpx.Limits(max_connections=max(viewer_counts) * 2, max_keepalive_connections=max(viewer_counts) * 2)
+    timeout = httpx.Timeout(args.timeout)
+    results = {
+        "benchmark": "load_test",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "target": args.url or "in-process",
+            "backend": None if args.url else os.environ.get("SNOWFLAKE_BACKEND"),
+            "latency_ms": None if args.url else args.latency_ms,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "live_interval_s": LIVE_INTERVAL_SECONDS,
+            "dashboard_interval_s": DASHBOARD_INTERVAL_SECONDS,
+            "dashboard_paths": DASHBOARD_PATHS,
+            "chat_interval_s": args.chat_interval,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+
+    async def run_all(client: httpx.AsyncClient, in_process: bool):
+        for count in viewer_counts:
+            entry = await run(client, count, args, in_process)
+            results["runs"].append(entry)
+            print(
+                f"{count:>5} viewers: {entry['throughput_rps']:8.1f} req/s  "
+                f"p50 {entry['p50_ms']} ms  p95 {entry['p95_ms']} ms  p99 {entry['p99_ms']} ms  "
+                f"errors {entry['errors']}  queries/req {entry['backend_queries_per_request']}  "
+                f"rss {entry['memory']['rss_max_mb']} MB"
+            )
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            await run_all(client, in_process=False)
+        return results
+
+    from api.main import app
+
+    # Per-request INFO lines and 503 warnings would swamp the summary at 1,000 viewers.
+    logging.getLogger().setLevel(args.log_level)
+    # httpx's ASGI transport does not run the lifespan, so enter it here.
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            await run_all(client, in_process=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", default="1,10,100,1000", help="comma-separated viewer counts, one run each")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=10, help="unmeasured seconds before each run")
+    parser.add_argument("--latency-ms", type=float, default=150, help="simulated Snowflake round trip (in-process only)")
+    parser.add_argument("--chat-interval", type=float, default=300,
+                        help="mean seconds between Copilot questions per viewer; 0 disables chat")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="ERROR", help="app log level for in-process runs")
+    parser.add_argument("--output", help="results file (default load_test_<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not args.url:
+        # Must be set before api.main is imported and the service is created.
+        os.environ.setdefault("SNOWFLAKE_BACKEND", "local")
+        os.environ.setdefault("LOCAL_QUERY_LATENCY_MS", str(args.latency_ms))
+        args.latency_ms = float(os.environ["LOCAL_QUERY_LATENCY_MS"])
+
+    results = asyncio.run(main_async(args))
+    output = args.output or f"load_test_{(results['git']['commit'] or 'unknown')[:10]}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time JSON rendering of a 10k-row telemetry payload, FastAPI's default path vs FastJSONResponse.
+
+Run from react/backend:
+
+    python -m benchmarks.serialization_benchmark [--rows 10000] [--repeat 20]
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services import serialization
+from services.serialization import FastJSONResponse, _default
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def telemetry_rows(count: int):
+    """Rows shaped like /api/anomaly-events: Decimal scores and TIMESTAMP_NTZ values, as the connector returns them."""
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "EVENT_ID": f"EVT-{i:06d}",
+            "ASSET_ID": f"ASSET-{i % 40:02d}",
+            "TIMESTAMP": start + timedelta(seconds=i),
+            "ANOMALY_TYPE": "VIBRATION_SPIKE",
+            "SEVERITY": random.choice(["LOW", "MEDIUM", "HIGH"]),
+            "ANOMALY_SCORE": Decimal(f"{random.random():.4f}"),
+            "ROOT_CAUSE": "Bearing wear on drive side",
+            "SUGGESTED_FIX": "Schedule bearing replacement",
+            "TEMPERATURE_C": random.uniform(150, 230),
+            "VIBRATION_G": random.uniform(0, 1),
+            "CREATED_AT": start + timedelta(seconds=i, milliseconds=250),
+        }
+        for i in range(count)
+    ]
+
+
+def fastapi_default(content):
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def stdlib_fallback(content):
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def timed(fn, content, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return body, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    content = {"events": telemetry_rows(args.rows)}
+    variants = [
+        ("jsonable_encoder + JSONResponse (before)", fastapi_default),
+        ("FastJSONResponse, stdlib json", stdlib_fallback),
+    ]
+    if serialization.orjson is not None:
+        variants.append(("FastJSONResponse, orjson", lambda c: FastJSONResponse(c).body))
+
+    print(f"{args.rows} rows, median of {args.repeat} runs")
+    baseline = None
+    for name, fn in variants:
+        body, ms = timed(fn, content, args.repeat)
+        baseline = baseline or ms
+        print(f"  {name:<42} {ms:8.1f} ms  {len(body) / 1024:8.0f} KiB  {baseline / ms:5.1f}x")
+
+    compressors = [("gzip level 5", lambda b: gzip.compress(b, compresslevel=5))]
+    if brotli is not None:
+        compressors.append(("brotli quality 4", lambda b: brotli.compress(b, quality=4)))
+    for name, fn in compressors:
+        compressed, ms = timed(fn, body, args.repeat)
+        print(f"  {name:<42} {ms:8.1f} ms  {len(compressed) / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
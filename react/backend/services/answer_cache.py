@@ -0,0 +1,62 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation so trivial rewordings match."""
+    collapsed = " ".join(question.lower().split())
+    return re.sub(r"[\s?.!]+$", "", collapsed)
+
+
+class AnswerCache:
+    """Bounded TTL cache of Copilot answers keyed on question and data version.
+
+    The data-version fingerprint is part of the key, and entries recorded under
+    an older fingerprint are dropped as soon as a newer one is seen, so answers
+    go stale automatically when the underlying tables change.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 900):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._fingerprint: Optional[str] = None
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+    def _observe(self, fingerprint: str):
+        if fingerprint != self._fingerprint:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+    def get(self, question: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        self._observe(fingerprint)
+        key = (normalize_question(question), fingerprint)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def put(self, question: str, fingerprint: str, answer: Dict[str, Any]):
+        self._observe(fingerprint)
+        key = (normalize_question(question), fingerprint)
+        self._entries[key] = (time.monotonic() + self.ttl, answer)
+        self._entries.move_to_end(key)
+        self._stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **self._stats,
+        }
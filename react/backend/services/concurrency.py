@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitError(Exception):
+    """Raised when a route is saturated and a request waited too long for a slot."""
+
+    def __init__(self, name: str, limit: int):
+        super().__init__(f"Too many concurrent requests for {name} (limit {limit})")
+        self.name = name
+        self.limit = limit
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests for one route.
+
+    Instances are FastAPI dependencies: ``Depends(limiter)`` holds a slot for
+    the duration of the handler and releases it afterwards. Streaming handlers,
+    which outlive the dependency, hold ``async with limiter.slot()`` inside the
+    stream instead. Requests that cannot get a slot within ``max_wait`` seconds
+    raise ``ConcurrencyLimitError``.
+    """
+
+    def __init__(self, name: str, limit: int, max_wait: float = 5.0):
+        self.name = name
+        self.limit = limit
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(limit)
+        self._in_flight = 0
+        self._rejected = 0
+
+    async def __call__(self) -> AsyncIterator[None]:
+        async with self.slot():
+            yield
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"Rejected request for {self.name}: {self.limit} already in flight")
+            raise ConcurrencyLimitError(self.name, self.limit)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "in_flight": self._in_flight, "rejected": self._rejected}
+
+
+class _WorkloadClass:
+    __slots__ = ("name", "priority", "limit", "max_queue", "in_flight", "queued", "admitted", "rejected")
+
+    def __init__(self, name: str, priority: int, limit: int, max_queue: int):
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+
+class PriorityAdmission:
+    """Admits Snowflake work from several workload classes into a shared budget by priority.
+
+    At most ``total`` units of work run at once, and each class at most its own
+    ``limit``. When a slot frees up it goes to the waiting request with the
+    lowest ``priority`` number whose class is under its limit, so live
+    telemetry is admitted ahead of queued analytic reads. A class with
+    ``max_queue`` requests already waiting rejects new ones immediately, and
+    waiters give up after ``max_wait`` seconds; both raise
+    ``ConcurrencyLimitError``.
+    """
+
+    def __init__(self, total: int, max_wait: float = 10.0):
+        self.total = total
+        self.max_wait = max_wait
+        self._classes: Dict[str, _WorkloadClass] = {}
+        self._waiters: List[Tuple[int, int, _WorkloadClass, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+
+    def add_class(self, name: str, priority: int, limit: int, max_queue: int = 100):
+        self._classes[name] = _WorkloadClass(name, priority, limit, max_queue)
+
+    def _has_room(self, workload: _WorkloadClass) -> bool:
+        return self._in_flight < self.total and workload.in_flight < workload.limit
+
+    def _admit(self, workload: _WorkloadClass):
+        self._in_flight += 1
+        workload.in_flight += 1
+        workload.admitted += 1
+
+    def _release(self, workload: _WorkloadClass):
+        self._in_flight -= 1
+        workload.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        for waiter in sorted(self._waiters, key=lambda item: item[:2]):
+            if self._in_flight >= self.total:
+                break
+            _, _, workload, future = waiter
+            if workload.in_flight < workload.limit:
+                self._waiters.remove(waiter)
+                workload.queued -= 1
+                self._admit(workload)
+                future.set_result(None)
+
+    def _reject(self, workload: _WorkloadClass, reason: str):
+        workload.rejected += 1
+        logger.warning(f"Rejected {workload.name} work: {reason}")
+        raise ConcurrencyLimitError(f"{workload.name} workload", workload.limit)
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        workload = self._classes[name]
+        if self._has_room(workload):
+            self._admit(workload)
+        else:
+            if workload.queued >= workload.max_queue:
+                self._reject(workload, f"{workload.queued} already queued")
+            future = asyncio.get_running_loop().create_future()
+            waiter = (workload.priority, next(self._seq), workload, future)
+            self._waiters.append(waiter)
+            workload.queued += 1
+            try:
+                await asyncio.wait({future}, timeout=self.max_wait)
+            except asyncio.CancelledError:
+                if future.done():
+                    self._release(workload)
+                else:
+                    self._waiters.remove(waiter)
+                    workload.queued -= 1
+                raise
+            if not future.done():
+                self._waiters.remove(waiter)
+                workload.queued -= 1
+                self._reject(workload, f"no slot within {self.max_wait:.0f}s")
+        try:
+            yield
+        finally:
+            self._release(workload)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "in_flight": self._in_flight,
+            "classes": {
+                workload.name: {
+                    "priority": workload.priority,
+                    "limit": workload.limit,
+                    "in_flight": workload.in_flight,
+                    "queue_depth": workload.queued,
+                    "max_queue": workload.max_queue,
+                    "admitted": workload.admitted,
+                    "rejected": workload.rejected,
+                }
+                for workload in self._classes.values()
+            },
+        }
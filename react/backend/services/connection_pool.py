@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the wait time."""
+
+
+class PooledConnection:
+    """A Snowflake connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Session parameters already applied to this connection, so callers can
+        # skip re-issuing ALTER SESSION when the value has not changed.
+        self.session_params: Dict[str, Any] = {}
+
+    def is_healthy(self) -> bool:
+        try:
+            return not self.connection.is_closed()
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            if not self.connection.is_closed():
+                self.connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {e}")
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of Snowflake connections.
+
+    Connections are opened lazily up to ``max_size``, or ahead of time up to
+    ``min_size`` with ``prewarm``. Idle connections are reused
+    most-recently-used first and closed once they have been idle longer than
+    ``max_idle_seconds``, except that ``min_size`` connections stay open.
+    Connections older than ``max_lifetime_seconds`` are closed when they come
+    back to the pool or are next found idle, ``min_size`` ones included, so a
+    long-lived connection is replaced before its server session expires. An
+    error raised while a connection is checked out discards it when
+    ``discard_on`` returns true for that error, e.g. an expired session the
+    connection does not know about. Callers that find the pool exhausted wait up to ``wait_timeout`` seconds
+    before ``PoolTimeoutError`` is raised.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 8,
+        wait_timeout: float = 10.0,
+        max_idle_seconds: float = 300.0,
+        min_size: int = 0,
+        max_lifetime_seconds: Optional[float] = None,
+        discard_on: Optional[Callable[[Exception], bool]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self.max_size = max_size
+        self.min_size = min(max(min_size, 0), max_size)
+        self.wait_timeout = wait_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self._discard_on = discard_on
+        self._idle: Deque[PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "evicted_idle": 0,
+            "evicted_unhealthy": 0,
+            "recycled": 0,
+            "discarded_on_error": 0,
+        }
+
+    def _is_expired(self, pooled: PooledConnection, now: float) -> bool:
+        return self.max_lifetime_seconds is not None and now - pooled.created_at >= self.max_lifetime_seconds
+
+    def _evict_idle_locked(self) -> list:
+        """Pop connections past ``max_lifetime_seconds`` or idle past ``max_idle_seconds``; caller closes them."""
+        now = time.monotonic()
+        expired = [pooled for pooled in self._idle if self._is_expired(pooled, now)]
+        if expired:
+            self._idle = deque(pooled for pooled in self._idle if not self._is_expired(pooled, now))
+            self._stats["recycled"] += len(expired)
+        recycled = len(expired)
+        cutoff = now - self.max_idle_seconds
+        while self._idle and self._idle[0].last_used < cutoff and self._size - len(expired) > self.min_size:
+            expired.append(self._idle.popleft())
+        self._size -= len(expired)
+        self._stats["evicted_idle"] += len(expired) - recycled
+        if expired:
+            self._cond.notify(len(expired))
+        return expired
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Check out a healthy connection, opening a new one if there is room."""
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                expired = self._evict_idle_locked()
+                pooled = None
+                reserve = False
+                waited = False
+                while pooled is None and not reserve:
+                    if self._idle:
+                        pooled = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        reserve = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise PoolTimeoutError(
+                                f"Timed out after {timeout:.1f}s waiting for a Snowflake connection "
+                                f"(pool size {self.max_size})"
+                            )
+                        if not waited:
+                            self._stats["waits"] += 1
+                            waited = True
+                        self._cond.wait(remaining)
+
+            for stale in expired:
+                stale.close()
+
+            if reserve:
+                try:
+                    pooled = PooledConnection(self._factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+            elif not pooled.is_healthy():
+                with self._cond:
+                    self._size -= 1
+                    self._stats["evicted_unhealthy"] += 1
+                    self._cond.notify()
+                pooled.close()
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return pooled
+
+    def prewarm(self) -> int:
+        """Open idle connections until ``min_size`` are open; returns how many this call opened.
+
+        Several threads may call this at once to open connections in parallel;
+        each reserves a slot before connecting, so the pool never overshoots.
+        """
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return opened
+                self._size += 1
+            try:
+                pooled = PooledConnection(self._factory())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+                if self._closed:
+                    self._size -= 1
+                else:
+                    self._idle.append(pooled)
+                    self._cond.notify()
+                    pooled = None
+            if pooled is not None:
+                pooled.close()
+            opened += 1
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        """Return a connection to the pool, or close it if ``discard`` is set."""
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            expired = self._is_expired(pooled, pooled.last_used)
+            keep = not discard and not expired and not self._closed and pooled.is_healthy()
+            if expired and not discard:
+                self._stats["recycled"] += 1
+            if keep:
+                self._idle.append(pooled)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not keep:
+            pooled.close()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[PooledConnection]:
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        except Exception as e:
+            discard = self._discard_on is not None and self._discard_on(e)
+            if discard:
+                with self._cond:
+                    self._stats["discarded_on_error"] += 1
+            self.release(pooled, discard=discard or not pooled.is_healthy())
+            raise
+        else:
+            self.release(pooled)
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            pooled.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "min_size": self.min_size,
+                "open": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                **self._stats,
+            }
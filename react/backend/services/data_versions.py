@@ -0,0 +1,85 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+
+class DataVersion:
+    """Version of the data behind a response: a weak ``ETag`` and a ``Last-Modified`` time.
+
+    Two versions are equal when their ETags are, so a version can be stored
+    next to a cached result and compared with the current one.
+    """
+
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, etag: str, last_modified: datetime):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, DataVersion) and other.etag == self.etag
+
+    def __hash__(self) -> int:
+        return hash(self.etag)
+
+    def headers(self) -> Dict[str, str]:
+        # no-cache lets browsers keep the body but makes them revalidate every
+        # poll, which is what turns repeat polls into 304s.
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+    def matches(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Whether a request with these conditional headers already has this version."""
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            # HTTP dates have one-second resolution.
+            return since is not None and self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+class DataVersionTracker:
+    """Turns per-table change tokens into ``DataVersion``s for endpoints.
+
+    Tokens come from ``SYSTEM$LAST_CHANGE_COMMIT_TIME``, which Snowflake answers
+    from metadata, so one statement covers every tracked table. Tokens are
+    opaque, so ``Last-Modified`` is the time this process first saw a table's
+    current token.
+    """
+
+    def __init__(self, tables: Sequence[str]):
+        self.tables = tuple(tables)
+        self._seen: Dict[str, Tuple[Any, datetime]] = {}
+
+    @property
+    def query(self) -> str:
+        columns = ",\n    ".join(
+            f"SYSTEM$LAST_CHANGE_COMMIT_TIME('{table}') AS \"{table}\"" for table in self.tables
+        )
+        return f"SELECT\n    {columns}"
+
+    def observe(self, tokens: Mapping[str, Any]):
+        now = datetime.now(timezone.utc)
+        for table in self.tables:
+            token = tokens.get(table)
+            seen = self._seen.get(table)
+            if seen is None or seen[0] != token:
+                self._seen[table] = (token, now)
+
+    def version(self, tables: Sequence[str], extra: str = "") -> Optional[DataVersion]:
+        """Combined version of ``tables``, or None if any of them has not been observed."""
+        seen = [self._seen.get(table) for table in tables]
+        if any(entry is None for entry in seen):
+            return None
+        key = "|".join(f"{table}={token}" for table, (token, _) in zip(tables, seen))
+        digest = hashlib.sha1(f"{key}|{extra}".encode("utf-8")).hexdigest()[:16]
+        return DataVersion(f'W/"{digest}"', max(modified for _, modified in seen))
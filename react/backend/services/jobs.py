@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+
+class JobNotFoundError(Exception):
+    """Raised for a job id this process did not submit, or one that has expired."""
+
+
+class Job:
+    """An asynchronously submitted Snowflake query, identified to clients by ``job_id``."""
+
+    def __init__(self, analysis: str, sfqid: str, params: Optional[Dict[str, Any]] = None):
+        self.job_id = uuid.uuid4().hex
+        self.analysis = analysis
+        self.sfqid = sfqid
+        self.params = params or {}
+        self.submitted_at = datetime.now(timezone.utc)
+        self.submitted_monotonic = time.monotonic()
+        self.state = "running"
+        self.status = "RUNNING"
+        self.error: Optional[str] = None
+        self.finished_after: Optional[float] = None
+
+    def update(self, state: str, status: str, error: Optional[str] = None):
+        if self.state == "running" and state != "running":
+            self.finished_after = time.monotonic() - self.submitted_monotonic
+        self.state = state
+        self.status = status
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "analysis": self.analysis,
+            "params": self.params,
+            "sfqid": self.sfqid,
+            "state": self.state,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at.isoformat(),
+            "elapsed_seconds": round(
+                self.finished_after if self.finished_after is not None
+                else time.monotonic() - self.submitted_monotonic,
+                1,
+            ),
+        }
+
+
+class JobStore:
+    """Bounded registry of submitted jobs.
+
+    Only the id mapping lives here; query state and results stay in Snowflake,
+    which keeps results of finished queries for ``retention_seconds`` (24 hours).
+    """
+
+    def __init__(self, max_jobs: int = 200, retention_seconds: float = 24 * 3600):
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> Job:
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            self._prune_locked()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Unknown or expired job {job_id}")
+        return job
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            self._prune_locked()
+            return list(reversed(self._jobs.values()))
+
+    def _prune_locked(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.submitted_monotonic >= cutoff:
+                break
+            self._jobs.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {
+            "jobs": len(states),
+            "running": states.count("running"),
+            "succeeded": states.count("succeeded"),
+            "failed": states.count("failed"),
+            "max_jobs": self.max_jobs,
+        }
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+
+class FeedFullError(Exception):
+    """Raised when the live feed already has its maximum number of subscribers."""
+
+
+class Subscription:
+    """One client's view of the live feed: an asset filter and a bounded queue of batches.
+
+    A ``None`` in the queue means the feed closed this subscription.
+    """
+
+    def __init__(self, asset_ids: Optional[Set[str]], queue_size: int):
+        self.asset_ids = asset_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.consecutive_drops = 0
+        self.closed = False
+
+    def matches(self, row: Row) -> bool:
+        return self.asset_ids is None or row.get("ASSET_ID") in self.asset_ids
+
+    def filter(self, rows: List[Row]) -> List[Row]:
+        return rows if self.asset_ids is None else [row for row in rows if self.matches(row)]
+
+
+class LiveSensorFeed:
+    """Polls IOT_STREAMING_LIVE once per interval and fans new rows out to every subscriber.
+
+    Warehouse load is one incremental query per interval regardless of how many
+    clients are connected, and polling stops entirely while there is no demand:
+    no subscribers, and no ``touch`` from other consumers (like the sensor
+    buffers) within the last ``idle_timeout`` seconds. Each subscriber has a
+    bounded queue: when it is full the oldest batch is dropped, and a subscriber
+    that keeps falling behind for ``max_consecutive_drops`` intervals is
+    disconnected.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Optional[datetime]], Awaitable[List[Row]]],
+        interval: float = 1.0,
+        window_seconds: float = 30.0,
+        max_subscribers: int = 200,
+        queue_size: int = 30,
+        max_consecutive_drops: int = 30,
+        idle_timeout: float = 0.0,
+    ):
+        self._fetch = fetch
+        self.interval = interval
+        self.window_seconds = window_seconds
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.max_consecutive_drops = max_consecutive_drops
+        self.idle_timeout = idle_timeout
+        self._touched_at: Optional[float] = None
+        self._subscribers: Set[Subscription] = set()
+        self._window: List[Row] = []
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {"polls": 0, "poll_errors": 0, "rows_fanned_out": 0, "rejected": 0, "evicted": 0}
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        return self._watermark
+
+    @property
+    def active(self) -> bool:
+        if self._subscribers:
+            return True
+        return self._touched_at is not None and time.monotonic() - self._touched_at < self.idle_timeout
+
+    def subscribe(self, asset_ids: Optional[Set[str]] = None) -> Subscription:
+        if len(self._subscribers) >= self.max_subscribers:
+            self._stats["rejected"] += 1
+            raise FeedFullError(f"Live feed is at its limit of {self.max_subscribers} subscribers")
+        subscription = Subscription(asset_ids, self.queue_size)
+        self._subscribers.add(subscription)
+        self._ensure_running()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        self._subscribers.discard(subscription)
+
+    def window(self, subscription: Optional[Subscription] = None) -> List[Row]:
+        """Rows from the last ``window_seconds`` seconds, newest ingestion first."""
+        return subscription.filter(self._window) if subscription else list(self._window)
+
+    def touch(self):
+        """Record demand from a consumer that reads the polls without subscribing.
+
+        Polling starts (or continues) and keeps going for ``idle_timeout``
+        seconds after the last call.
+        """
+        self._touched_at = time.monotonic()
+        self._ensure_running()
+
+    def _ensure_running(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="live-sensor-feed")
+
+    async def _run(self):
+        while True:
+            if not self.active:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            started = time.monotonic()
+            await self._poll_once()
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    async def _poll_once(self):
+        try:
+            rows = await self._fetch(self._watermark)
+        except Exception as e:
+            self._stats["poll_errors"] += 1
+            logger.error(f"Live sensor feed poll failed: {e}")
+            return
+        self._stats["polls"] += 1
+        if not rows:
+            return
+        newest = max(row["INGESTION_TIME"] for row in rows)
+        self._watermark = max(newest, self._watermark) if self._watermark else newest
+        self._extend_window(rows)
+        self._fan_out(rows)
+
+    def _extend_window(self, rows: List[Row]):
+        cutoff = self._watermark - timedelta(seconds=self.window_seconds)
+        merged = rows + self._window
+        self._window = [row for row in merged if row["INGESTION_TIME"] > cutoff]
+
+    def _fan_out(self, rows: List[Row]):
+        for subscription in list(self._subscribers):
+            batch = subscription.filter(rows)
+            if not batch:
+                continue
+            if subscription.queue.full():
+                subscription.queue.get_nowait()
+                subscription.dropped += 1
+                subscription.consecutive_drops += 1
+                if subscription.consecutive_drops >= self.max_consecutive_drops:
+                    logger.warning("Disconnecting live feed subscriber that stopped reading")
+                    self._stats["evicted"] += 1
+                    self.unsubscribe(subscription)
+                    # A slot was just freed; None tells the reader to stop.
+                    subscription.queue.put_nowait(None)
+                    continue
+            else:
+                subscription.consecutive_drops = 0
+            subscription.queue.put_nowait(batch)
+            self._stats["rows_fanned_out"] += len(batch)
+
+    async def stop(self):
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "active": self.active,
+            "idle_timeout": self.idle_timeout,
+            "window_rows": len(self._window),
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            **self._stats,
+        }
@@ -0,0 +1,754 @@
+import io
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from services.snowflake_service import SnowflakeService
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - only needed for SNOWFLAKE_BACKEND=local
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+DATABASE = "SNOWCORE_PDM"
+SCHEMAS = ("RAW", "ATOMIC", "PDM", "CONFIG", "DATA_MART")
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[3] / "data" / "generated"
+
+# data/generated/*.csv and the tables sql/03_load_data.sql copies them into.
+SEED_TABLES = {
+    "anomaly_events.csv": "PDM.ANOMALY_EVENTS",
+    "cure_results.csv": "PDM.CURE_RESULTS",
+    "asset_status.csv": "DATA_MART.ASSET_STATUS",
+    "financial_summary.csv": "DATA_MART.FINANCIAL_SUMMARY",
+    "knowledge_base.csv": "PDM.KNOWLEDGE_BASE",
+    "maintenance_logs.csv": "ATOMIC.MAINTENANCE_LOGS",
+    "production_batches.csv": "ATOMIC.PRODUCTION_BATCHES",
+}
+
+# Seed tables whose history is rebased so the newest row is "now", and which
+# LOCAL_SEED_SCALE replicates further back in time: (time column, id column).
+HISTORY_TABLES = {
+    "PDM.ANOMALY_EVENTS": ("TIMESTAMP", "EVENT_ID"),
+    "PDM.CURE_RESULTS": ("CURE_TIMESTAMP", "BATCH_ID"),
+}
+
+# Metric ranges of PDM.GENERATE_SENSOR_READINGS (sql/06_streaming_simulation.sql).
+SENSOR_ASSETS = {
+    "LAYUP_ROOM": [("Humidity", 40, 60), ("Temperature", 20, 25)],
+    "AUTOCLAVE_01": [("Temperature", 150, 200), ("Pressure", 80, 120), ("VacuumLevel", -1.0, -0.92)],
+    "AUTOCLAVE_02": [("Temperature", 150, 200), ("Pressure", 80, 120), ("VacuumLevel", -1.0, -0.92)],
+    "CNC_MILL_01": [("SpindleSpeed", 8000, 12000), ("Vibration", 0.1, 0.5)],
+    "CNC_MILL_02": [("SpindleSpeed", 8000, 12000), ("Vibration", 0.1, 0.5)],
+    "LAYUP_BOT_01": [("TensionN", 80, 120), ("SpeedMPS", 0.8, 1.2)],
+    "LAYUP_BOT_02": [("TensionN", 80, 120), ("SpeedMPS", 0.8, 1.2)],
+}
+
+# CONFIG.ASSET_ECONOMICS seed values (sql/07_expected_cost_decision.sql):
+# downtime hours, cost per downtime hour, repair, scrap risk, PM hours, PM labor, PM parts.
+ASSET_ECONOMICS = {
+    "AUTOCLAVE_01": ("AUTOCLAVE", 10, 15000, 20000, 50000, 2, 8000, 10000),
+    "AUTOCLAVE_02": ("AUTOCLAVE", 10, 15000, 20000, 50000, 2, 8000, 10000),
+    "CNC_MILL_01": ("CNC", 4, 8000, 5000, 10000, 1, 3000, 2000),
+    "CNC_MILL_02": ("CNC", 4, 8000, 5000, 10000, 1, 3000, 2000),
+    "LAYUP_BOT_01": ("ROBOT", 3, 5000, 3000, 5000, 0.5, 2000, 1500),
+    "LAYUP_BOT_02": ("ROBOT", 3, 5000, 3000, 5000, 0.5, 2000, 1500),
+    "LAYUP_ROOM": ("ENVIRONMENT", 0, 15000, 2000, 150000, 0.5, 500, 500),
+    "QC_STATION_01": ("QC", 2, 5000, 2000, 5000, 0.5, 1000, 500),
+    "QC_STATION_02": ("QC", 2, 5000, 2000, 5000, 0.5, 1000, 500),
+}
+
+# Production-line graph used for the synthesized GNN propagation scores.
+GRAPH_EDGES = [
+    ("LAYUP_ROOM", "LAYUP_BOT_01", "ENV"),
+    ("LAYUP_ROOM", "LAYUP_BOT_02", "ENV"),
+    ("LAYUP_BOT_01", "AUTOCLAVE_01", "FLOW"),
+    ("LAYUP_BOT_02", "AUTOCLAVE_02", "FLOW"),
+    ("AUTOCLAVE_01", "CNC_MILL_01", "FLOW"),
+    ("AUTOCLAVE_02", "CNC_MILL_02", "FLOW"),
+    ("CNC_MILL_01", "QC_STATION_01", "FLOW"),
+    ("CNC_MILL_02", "QC_STATION_02", "FLOW"),
+]
+
+# (name, schedule, definition) as reported by SHOW TASKS. The two sensor tasks
+# are emulated by the engine's scheduler thread; the others are listed only.
+TASKS = [
+    ("SENSOR_GENERATION_TASK", "1 MINUTE", "INSERT INTO RAW.IOT_STREAMING_LIVE ... GENERATE_SENSOR_READINGS(...)"),
+    ("SENSOR_CLEANUP_TASK", "5 MINUTE", "DELETE FROM RAW.IOT_STREAMING_LIVE WHERE INGESTION_TIME < ..."),
+    ("ANOMALY_DETECTION_TASK", "5 MINUTE", "INSERT INTO PDM.ANOMALY_EVENTS ..."),
+    ("FAILURE_PROBABILITY_TASK", "5 MINUTE", "INSERT INTO PDM.FAILURE_PROBABILITY ..."),
+]
+
+# Rows per result batch handed out by get_result_batches, like the chunks
+# Snowflake splits a large result into.
+RESULT_BATCH_ROWS = 5000
+
+# Snowflake-dialect helpers, defined as DuckDB macros.
+MACROS = [
+    """CREATE MACRO dateadd(unit, n, ts) AS ts + to_seconds(CAST(n AS DOUBLE) * CASE lower(unit)
+        WHEN 'second' THEN 1 WHEN 'minute' THEN 60 WHEN 'hour' THEN 3600 WHEN 'day' THEN 86400 END)""",
+    "CREATE MACRO iff(condition, if_true, if_false) AS CASE WHEN condition THEN if_true ELSE if_false END",
+    "CREATE MACRO sf_to_timestamp(seconds) AS make_timestamp(CAST(seconds * 1000000 AS BIGINT))",
+    "CREATE MACRO parse_json(text) AS CAST(text AS JSON)",
+    "CREATE MACRO sf_array_contains(value, items) AS list_contains(CAST(items AS JSON[]), value)",
+    """CREATE MACRO width_bucket(x, low, high, buckets) AS CASE
+        WHEN x IS NULL THEN NULL
+        WHEN x < low THEN 0
+        WHEN x >= high THEN buckets + 1
+        ELSE CAST(floor((x - low) / (high - low) * buckets) AS INTEGER) + 1 END""",
+]
+
+# Views standing in for dynamic tables, written in the Snowflake dialect and
+# translated like any other statement.
+VIEWS = {
+    "PDM.MAINTENANCE_DECISIONS_LIVE": """
+        WITH latest_probabilities AS (
+            SELECT ASSET_ID, P_FAIL_24H, P_FAIL_7D, CONFIDENCE, TIMESTAMP
+            FROM SNOWCORE_PDM.PDM.FAILURE_PROBABILITY
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY TIMESTAMP DESC) = 1
+        ),
+        with_economics AS (
+            SELECT
+                lp.*,
+                ae.ASSET_TYPE,
+                ae.C_UNPLANNED_USD,
+                ae.C_PM_USD,
+                lp.P_FAIL_7D * ae.C_UNPLANNED_USD AS EXPECTED_UNPLANNED_COST,
+                (lp.P_FAIL_7D * ae.C_UNPLANNED_USD) - ae.C_PM_USD AS NET_BENEFIT
+            FROM latest_probabilities lp
+            JOIN SNOWCORE_PDM.CONFIG.V_ASSET_ECONOMICS ae ON lp.ASSET_ID = ae.ASSET_ID
+        )
+        SELECT
+            ASSET_ID,
+            ASSET_TYPE,
+            CURRENT_TIMESTAMP() AS DECISION_TIMESTAMP,
+            P_FAIL_24H,
+            P_FAIL_7D,
+            CONFIDENCE,
+            C_UNPLANNED_USD,
+            C_PM_USD,
+            ROUND(EXPECTED_UNPLANNED_COST, 0) AS EXPECTED_UNPLANNED_COST,
+            ROUND(NET_BENEFIT, 0) AS NET_BENEFIT,
+            CASE
+                WHEN P_FAIL_7D > 0.6 OR NET_BENEFIT > C_PM_USD * 2 THEN 'URGENT'
+                WHEN NET_BENEFIT > 0 THEN 'PLAN_PM'
+                ELSE 'MONITOR'
+            END AS RECOMMENDATION,
+            CASE
+                WHEN P_FAIL_7D > 0.6 THEN 'THIS_SHIFT'
+                WHEN NET_BENEFIT > C_PM_USD THEN 'NEXT_STOP'
+                ELSE 'WITHIN_7D'
+            END AS TARGET_WINDOW
+        FROM with_economics
+    """,
+    "ATOMIC.ASSET_SENSORS_WIDE": """
+        WITH readings AS (
+            SELECT
+                TO_TIMESTAMP(RECORD_CONTENT:timestamp::NUMBER / 1000) AS EVENT_TIMESTAMP,
+                SPLIT_PART(RECORD_METADATA:topic::STRING, '/', -1) AS ASSET_ID,
+                m.value:name::STRING AS METRIC_NAME,
+                m.value:value::FLOAT AS METRIC_VALUE
+            FROM SNOWCORE_PDM.RAW.IOT_STREAMING_LIVE,
+            LATERAL FLATTEN(input => RECORD_CONTENT:metrics) m
+        )
+        SELECT
+            EVENT_TIMESTAMP,
+            ASSET_ID,
+            MAX(CASE WHEN METRIC_NAME = 'Temperature' THEN METRIC_VALUE END) AS TEMPERATURE_C,
+            MAX(CASE WHEN METRIC_NAME = 'Pressure' THEN METRIC_VALUE END) AS PRESSURE_PSI,
+            MAX(CASE WHEN METRIC_NAME = 'VacuumLevel' THEN METRIC_VALUE END) AS VACUUM_MBAR,
+            MAX(CASE WHEN METRIC_NAME = 'Humidity' THEN METRIC_VALUE END) AS HUMIDITY_PCT,
+            MAX(CASE WHEN METRIC_NAME = 'Vibration' THEN METRIC_VALUE END) AS VIBRATION_G,
+            MAX(CASE WHEN METRIC_NAME = 'TensionN' THEN METRIC_VALUE END) AS TENSION_FORCE_N,
+            MAX(CASE WHEN METRIC_NAME = 'SpeedMPS' THEN METRIC_VALUE END) AS FEED_RATE_MPS,
+            MAX(CASE WHEN METRIC_NAME = 'SpindleSpeed' THEN METRIC_VALUE END) AS SPINDLE_SPEED_RPM
+        FROM readings
+        GROUP BY EVENT_TIMESTAMP, ASSET_ID
+    """,
+}
+
+_PARAM = re.compile(r"%\((\w+)\)s")
+_DATEADD_BARE_UNIT = re.compile(r"\bDATEADD\(\s*([A-Za-z]+)\s*,", re.IGNORECASE)
+_CURRENT_TIMESTAMP = re.compile(r"\bCURRENT_TIMESTAMP\(\)", re.IGNORECASE)
+_TO_TIMESTAMP = re.compile(r"\bTO_TIMESTAMP(?:_NTZ)?\(", re.IGNORECASE)
+_TO_VARIANT = re.compile(r"\b([A-Za-z_][\w.]*)::VARIANT\b", re.IGNORECASE)
+_ARRAY_CONTAINS = re.compile(r"\bARRAY_CONTAINS\(", re.IGNORECASE)
+_FLATTEN = re.compile(r"\bLATERAL\s+FLATTEN\(\s*input\s*=>\s*([^)]*?)\s*\)\s+(\w+)", re.IGNORECASE)
+_VARIANT_PATH = re.compile(r"\b([A-Za-z_][\w.]*)(?<!:):(?!:)([A-Za-z_]\w*)(?:::(\w+))?")
+_CHANGE_TOKEN = re.compile(r"SYSTEM\$LAST_CHANGE_COMMIT_TIME\(\s*'([^']+)'\s*\)", re.IGNORECASE)
+_WRITE_TARGET = re.compile(r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|MERGE\s+INTO)\s+([\w.]+)", re.IGNORECASE)
+_ALTER_SESSION = re.compile(r"^\s*ALTER\s+SESSION\b", re.IGNORECASE)
+_ALTER_TASK = re.compile(r"^\s*ALTER\s+TASK\s+([\w.]+)\s+(RESUME|SUSPEND)\s*;?\s*$", re.IGNORECASE)
+_SHOW_TASKS = re.compile(r"^\s*SHOW\s+TASKS\b", re.IGNORECASE)
+_GENERATE_READINGS = re.compile(r"GENERATE_SENSOR_READINGS\(\s*(\d+)", re.IGNORECASE)
+
+_NUMERIC_TYPES = {"NUMBER", "NUMERIC", "DECIMAL", "FLOAT", "DOUBLE", "REAL", "INT", "INTEGER", "BIGINT"}
+_STRING_TYPES = {"STRING", "VARCHAR", "TEXT"}
+
+
+def _variant_path(match: "re.Match") -> str:
+    column, key, cast = match.group(1), match.group(2), (match.group(3) or "").upper()
+    if not cast:
+        return f"json_extract({column}, '$.{key}')"
+    extracted = f"json_extract_string({column}, '$.{key}')"
+    if cast in _STRING_TYPES:
+        return extracted
+    if cast in _NUMERIC_TYPES:
+        return f"CAST({extracted} AS DOUBLE)"
+    return f"CAST({extracted} AS {cast})"
+
+
+def translate(query: str) -> str:
+    """Rewrite the Snowflake dialect used by the API's queries into DuckDB SQL.
+
+    Covers ``LATERAL FLATTEN``, ``:`` variant paths with ``::`` casts,
+    ``DATEADD`` with bare units, ``CURRENT_TIMESTAMP()``, ``TO_TIMESTAMP`` on
+    epoch seconds, ``::VARIANT`` with ``ARRAY_CONTAINS`` and ``%(name)s``
+    parameters. ``SPLIT_PART`` with negative indexes, ``QUALIFY``, ``CORR`` and
+    ``LISTAGG`` work as-is; ``IFF``, ``PARSE_JSON`` and ``WIDTH_BUCKET`` are
+    macros.
+    """
+    query = _PARAM.sub(r"$\1", query)
+    query = _FLATTEN.sub(r"LATERAL (SELECT unnest(CAST(\1 AS JSON[])) AS value) \2", query)
+    query = _TO_VARIANT.sub(r"to_json(\1)", query)
+    query = _ARRAY_CONTAINS.sub("sf_array_contains(", query)
+    query = _VARIANT_PATH.sub(_variant_path, query)
+    query = _DATEADD_BARE_UNIT.sub(r"DATEADD('\1',", query)
+    query = _CURRENT_TIMESTAMP.sub("CAST(current_timestamp AS TIMESTAMP)", query)
+    return _TO_TIMESTAMP.sub("sf_to_timestamp(", query)
+
+
+def _qualified(name: str) -> str:
+    parts = name.upper().split(".")
+    return ".".join([DATABASE] * (3 - len(parts)) + parts) if len(parts) < 3 else ".".join(parts)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class QueryStatus(Enum):
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILED_WITH_ERROR = "FAILED_WITH_ERROR"
+
+
+class _AsyncQuery:
+    __slots__ = ("status", "description", "rows", "error")
+
+    def __init__(self):
+        self.status = QueryStatus.RUNNING
+        self.description: Optional[List[Tuple]] = None
+        self.rows: List[Tuple] = []
+        self.error: Optional[Exception] = None
+
+
+class LocalEngine:
+    """In-process DuckDB database shaped like SNOWCORE_PDM.
+
+    Seeded from ``data/generated/*.csv`` plus synthesized failure
+    probabilities, GNN scores, triggers and live sensor readings. While
+    SENSOR_GENERATION_TASK is resumed a scheduler thread writes one reading
+    per asset every second, and SENSOR_CLEANUP_TASK drops readings older than
+    ten minutes, so the live endpoints always have a current window.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = DEFAULT_DATA_DIR,
+        seed_scale: int = 1,
+        backfill_seconds: int = 600,
+        sensor_retention_seconds: int = 600,
+        latency_ms: float = 0.0,
+    ):
+        if duckdb is None:
+            raise RuntimeError("SNOWFLAKE_BACKEND=local requires the duckdb package")
+        self.data_dir = Path(data_dir)
+        self.seed_scale = max(int(seed_scale), 1)
+        self.sensor_retention_seconds = sensor_retention_seconds
+        self.latency_ms = latency_ms
+        self._db = duckdb.connect()
+        self._db.execute(f"ATTACH ':memory:' AS {DATABASE}")
+        self._lock = threading.Lock()
+        self._change_tokens: Dict[str, int] = {}
+        self._task_states = {name: "started" for name, _, _ in TASKS}
+        self._async_queries: "OrderedDict[str, _AsyncQuery]" = OrderedDict()
+        self._stop = threading.Event()
+
+        start = time.perf_counter()
+        conn = self.connect()
+        for schema in SCHEMAS:
+            conn.execute(f"CREATE SCHEMA {schema}")
+        for macro in MACROS:
+            conn.execute(macro)
+        self._seed_csv(conn)
+        self._seed_synthetic(conn)
+        for name, definition in VIEWS.items():
+            conn.execute(f"CREATE VIEW {name} AS {translate(definition)}")
+        now = _utcnow()
+        self.generate_readings(conn, backfill_seconds, until=now)
+        logger.info(f"Local engine seeded in {(time.perf_counter() - start) * 1000:.0f} ms from {self.data_dir}")
+
+        self._scheduler = threading.Thread(target=self._run_scheduler, name="local-engine-tasks", daemon=True)
+        self._scheduler.start()
+
+    def connect(self):
+        """A DuckDB connection to the shared database, one per thread or pooled connection."""
+        conn = self._db.cursor()
+        conn.execute(f"USE {DATABASE}")
+        conn.execute("SET TimeZone = 'UTC'")
+        return conn
+
+    def close(self):
+        self._stop.set()
+        self._scheduler.join(timeout=2)
+        self._db.close()
+
+    def _seed_csv(self, conn):
+        for filename, table in SEED_TABLES.items():
+            path = self.data_dir / filename
+            if not path.exists():
+                logger.warning(f"Seed file {path} not found; {table} starts empty")
+                continue
+            source = f"read_csv_auto('{path.as_posix()}', header = true)"
+            if table not in HISTORY_TABLES:
+                conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {source}")
+                continue
+            time_column, id_column = HISTORY_TABLES[table]
+            # Rebase onto the current time, then add LOCAL_SEED_SCALE - 1 older
+            # copies so paging has a deep history to walk.
+            conn.execute(f"CREATE TEMP TABLE seed AS SELECT * FROM {source}")
+            newest = conn.execute(f"SELECT MAX({time_column}) FROM seed").fetchone()[0]
+            oldest = conn.execute(f"SELECT MIN({time_column}) FROM seed").fetchone()[0]
+            span = max((newest - oldest).total_seconds(), 1) if newest and oldest else 1
+            shift = (_utcnow() - newest).total_seconds() if newest else 0
+            conn.execute(
+                f"""
+                CREATE TABLE {table} AS
+                SELECT seed.* REPLACE (
+                    {time_column} + to_seconds($shift - copy * $span) AS {time_column},
+                    CASE WHEN copy = 0 THEN {id_column} ELSE {id_column} || '-' || copy END AS {id_column}
+                )
+                FROM seed, range($scale) AS copies(copy)
+                """,
+                {"shift": shift, "span": span, "scale": self.seed_scale},
+            )
+            conn.execute("DROP TABLE seed")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS PDM.ANOMALY_EVENTS (EVENT_ID VARCHAR, ASSET_ID VARCHAR, TIMESTAMP TIMESTAMP, "
+            "ANOMALY_TYPE VARCHAR, ANOMALY_SCORE DOUBLE, SEVERITY VARCHAR, ROOT_CAUSE VARCHAR, "
+            "SUGGESTED_FIX VARCHAR, RESOLVED BOOLEAN)"
+        )
+        conn.execute("ALTER TABLE PDM.ANOMALY_EVENTS ADD COLUMN CREATED_AT TIMESTAMP")
+        conn.execute("UPDATE PDM.ANOMALY_EVENTS SET CREATED_AT = TIMESTAMP")
+
+    def _seed_synthetic(self, conn):
+        rng = random.Random(42)
+        now = _utcnow()
+        health = {}
+        try:
+            health = dict(conn.execute("SELECT ASSET_ID, HEALTH_SCORE FROM DATA_MART.ASSET_STATUS").fetchall())
+        except duckdb.Error:
+            pass
+        assets = sorted(set(ASSET_ECONOMICS) | set(health))
+
+        conn.execute(
+            "CREATE TABLE CONFIG.ASSET_ECONOMICS (ASSET_ID VARCHAR, ASSET_TYPE VARCHAR, "
+            "UNPLANNED_DOWNTIME_HOURS_AVG DOUBLE, COST_PER_DOWNTIME_HOUR_USD DOUBLE, REPAIR_COST_AVG_USD DOUBLE, "
+            "SCRAP_RISK_USD DOUBLE, PM_DOWNTIME_HOURS_AVG DOUBLE, PM_LABOR_COST_USD DOUBLE, PM_PARTS_COST_USD DOUBLE)"
+        )
+        conn.executemany(
+            "INSERT INTO CONFIG.ASSET_ECONOMICS VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(asset, *values) for asset, values in ASSET_ECONOMICS.items()],
+        )
+        conn.execute(
+            """
+            CREATE VIEW CONFIG.V_ASSET_ECONOMICS AS
+            SELECT
+                *,
+                UNPLANNED_DOWNTIME_HOURS_AVG * COST_PER_DOWNTIME_HOUR_USD + REPAIR_COST_AVG_USD + SCRAP_RISK_USD
+                    AS C_UNPLANNED_USD,
+                PM_DOWNTIME_HOURS_AVG * COST_PER_DOWNTIME_HOUR_USD + PM_LABOR_COST_USD + PM_PARTS_COST_USD AS C_PM_USD
+            FROM CONFIG.ASSET_ECONOMICS
+            """
+        )
+
+        conn.execute(
+            "CREATE TABLE PDM.FAILURE_PROBABILITY (PROBABILITY_ID VARCHAR DEFAULT uuid()::VARCHAR, ASSET_ID VARCHAR, "
+            "TIMESTAMP TIMESTAMP, P_FAIL_24H DOUBLE, P_FAIL_7D DOUBLE, CONFIDENCE DOUBLE, ANOMALY_FEATURES JSON, "
+            "MODEL_VERSION VARCHAR DEFAULT 'local')"
+        )
+        probabilities = []
+        for asset in assets:
+            p_fail_7d = round(min(max((100 - float(health.get(asset, 85))) / 40 + rng.uniform(-0.05, 0.05), 0.01), 0.95), 3)
+            probabilities.append((asset, now, round(p_fail_7d / 4, 3), p_fail_7d, round(rng.uniform(0.7, 0.95), 2)))
+        conn.executemany(
+            "INSERT INTO PDM.FAILURE_PROBABILITY (ASSET_ID, TIMESTAMP, P_FAIL_24H, P_FAIL_7D, CONFIDENCE) "
+            "VALUES (?, ?, ?, ?, ?)",
+            probabilities,
+        )
+
+        conn.execute(
+            "CREATE TABLE PDM.GNN_PROPAGATION_SCORES (SCORE_ID VARCHAR DEFAULT uuid()::VARCHAR, "
+            "RUN_TIMESTAMP TIMESTAMP, SOURCE_ASSET VARCHAR, TARGET_ASSET VARCHAR, PROPAGATION_SCORE DOUBLE, "
+            "PROPAGATION_TYPE VARCHAR, EDGE_TYPE VARCHAR, HOP_DISTANCE INTEGER, CONFIDENCE DOUBLE, "
+            "CREATED_AT TIMESTAMP DEFAULT current_localtimestamp())"
+        )
+        scores = []
+        for source, target, edge_type in GRAPH_EDGES:
+            propagation_type = "HUMIDITY_CASCADE" if source == "LAYUP_ROOM" else "DOWNSTREAM"
+            scores.append((now, source, target, round(rng.uniform(0.2, 0.9), 3), propagation_type, edge_type, 1,
+                           round(rng.uniform(0.6, 0.95), 3)))
+        conn.executemany(
+            "INSERT INTO PDM.GNN_PROPAGATION_SCORES (RUN_TIMESTAMP, SOURCE_ASSET, TARGET_ASSET, PROPAGATION_SCORE, "
+            "PROPAGATION_TYPE, EDGE_TYPE, HOP_DISTANCE, CONFIDENCE) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            scores,
+        )
+        conn.execute("CREATE TABLE PDM.GNN_LATEST_RUN (RUN_TIMESTAMP TIMESTAMP, UPDATED_AT TIMESTAMP)")
+        conn.execute("INSERT INTO PDM.GNN_LATEST_RUN VALUES (?, ?)", [now, now])
+
+        conn.execute(
+            "CREATE TABLE CONFIG.ANOMALY_TRIGGERS (ASSET_ID VARCHAR PRIMARY KEY, TRIGGER_ACTIVE BOOLEAN DEFAULT FALSE, "
+            "TRIGGERED_AT TIMESTAMP, TRIGGERED_BY VARCHAR)"
+        )
+        conn.executemany("INSERT INTO CONFIG.ANOMALY_TRIGGERS (ASSET_ID) VALUES (?)", [(asset,) for asset in assets])
+
+        conn.execute(
+            "CREATE TABLE RAW.IOT_STREAMING_LIVE (RECORD_METADATA JSON, RECORD_CONTENT JSON, "
+            "INGESTION_TIME TIMESTAMP DEFAULT current_localtimestamp())"
+        )
+
+    def generate_readings(self, conn, seconds: int, until: Optional[datetime] = None):
+        """Insert ``seconds`` of readings for every asset, ending at ``until``, like GENERATE_SENSOR_READINGS."""
+        if seconds <= 0:
+            return
+        until = until or _utcnow()
+        anomaly_assets = {
+            row[0] for row in conn.execute("SELECT ASSET_ID FROM CONFIG.ANOMALY_TRIGGERS WHERE TRIGGER_ACTIVE").fetchall()
+        }
+        rows = []
+        for second in range(seconds):
+            ts = until - timedelta(seconds=seconds - second - 1)
+            ts_epoch = int(ts.replace(tzinfo=timezone.utc).timestamp() * 1000)
+            for asset_id, metrics in SENSOR_ASSETS.items():
+                values = []
+                for index, (name, low, high) in enumerate(metrics):
+                    value = random.uniform(low, high)
+                    if asset_id in anomaly_assets:
+                        if name == "VacuumLevel":
+                            value += 0.15
+                        elif name == "Humidity":
+                            value = min(85, value + 25)
+                        elif name == "Vibration":
+                            value *= 2.5
+                        elif name == "Temperature" and "AUTOCLAVE" in asset_id:
+                            value += 30
+                    values.append({
+                        "name": name,
+                        "alias": index + 1,
+                        "timestamp": ts_epoch,
+                        "dataType": "Float",
+                        "value": round(value, 2),
+                    })
+                rows.append({
+                    "metadata": {"topic": f"spBv1.0/SNOWCORE/DDATA/LINE_01/{asset_id}", "partition": 0, "offset": second},
+                    "content": {"timestamp": ts_epoch, "metrics": values, "seq": second % 256},
+                    "ingested": ts.isoformat(),
+                })
+        # One JSON document for the whole batch: executemany is row-at-a-time in
+        # DuckDB, and Python list parameters are converted value by value.
+        conn.execute(
+            """
+            INSERT INTO RAW.IOT_STREAMING_LIVE
+            SELECT row -> 'metadata', row -> 'content', CAST(row ->> 'ingested' AS TIMESTAMP)
+            FROM (SELECT unnest(CAST($rows AS JSON[])) AS row)
+            """,
+            {"rows": json.dumps(rows)},
+        )
+        self.mark_changed(f"{DATABASE}.RAW.IOT_STREAMING_LIVE")
+
+    def _run_scheduler(self):
+        conn = self.connect()
+        last_cleanup = time.monotonic()
+        while not self._stop.wait(1.0):
+            try:
+                if self._task_states["SENSOR_GENERATION_TASK"] == "started":
+                    self.generate_readings(conn, 1)
+                if (
+                    self._task_states["SENSOR_CLEANUP_TASK"] == "started"
+                    and time.monotonic() - last_cleanup >= 60
+                ):
+                    last_cleanup = time.monotonic()
+                    conn.execute(
+                        "DELETE FROM RAW.IOT_STREAMING_LIVE WHERE INGESTION_TIME < ?",
+                        [_utcnow() - timedelta(seconds=self.sensor_retention_seconds)],
+                    )
+            except Exception as e:
+                logger.warning(f"Local sensor task failed: {e}")
+        conn.close()
+
+    def mark_changed(self, table: str):
+        with self._lock:
+            self._change_tokens[table] = self._change_tokens.get(table, 0) + 1
+
+    def change_token(self, table: str) -> int:
+        with self._lock:
+            return self._change_tokens.get(_qualified(table), 0)
+
+    def simulate_latency(self):
+        """Block for about ``latency_ms`` (uniformly within +/-50%), standing in for a Snowflake round trip."""
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * random.uniform(0.5, 1.5) / 1000)
+
+    def execute(self, conn, query: str, params: Optional[Dict[str, Any]] = None):
+        """Run one statement on ``conn``.
+
+        Returns ``(description, rows)`` for statements answered by the engine
+        itself (sessions, tasks, the sensor generator), or None once a DuckDB
+        result is pending on ``conn``.
+        """
+        self.simulate_latency()
+        if _ALTER_SESSION.match(query):
+            return [("status",)], [("Statement executed successfully.",)]
+        match = _ALTER_TASK.match(query)
+        if match:
+            name = match.group(1).upper().split(".")[-1]
+            if name not in self._task_states:
+                raise duckdb.CatalogException(f"Task {match.group(1)} does not exist")
+            self._task_states[name] = "started" if match.group(2).upper() == "RESUME" else "suspended"
+            return [("status",)], [("Statement executed successfully.",)]
+        if _SHOW_TASKS.match(query):
+            created_on = _utcnow()
+            rows = [
+                (created_on, name, DATABASE, "PDM", "COMPUTE_WH", schedule, self._task_states[name], definition)
+                for name, schedule, definition in TASKS
+            ]
+            return [(column,) for column in ("created_on", "name", "database_name", "schema_name",
+                                             "warehouse", "schedule", "state", "definition")], rows
+        match = _GENERATE_READINGS.search(query)
+        if match:
+            self.generate_readings(conn, int(match.group(1)))
+            return [("number of rows inserted",)], [(int(match.group(1)) * len(SENSOR_ASSETS),)]
+
+        query = _CHANGE_TOKEN.sub(lambda m: str(self.change_token(m.group(1))), query)
+        sql = translate(query)
+        names = set(re.findall(r"\$(\w+)", sql))
+        conn.execute(sql, {name: value for name, value in (params or {}).items() if name in names} or None)
+        target = _WRITE_TARGET.match(query)
+        if target:
+            self.mark_changed(_qualified(target.group(1)))
+        return None
+
+    def submit(self, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Start ``query`` on a background thread, like ``execute_async``; returns its query id."""
+        sfqid = str(uuid.uuid4())
+        state = _AsyncQuery()
+        with self._lock:
+            self._async_queries[sfqid] = state
+            while len(self._async_queries) > 200:
+                self._async_queries.popitem(last=False)
+
+        def run():
+            conn = self.connect()
+            try:
+                answered = self.execute(conn, query, params)
+                if answered is not None:
+                    state.description, state.rows = answered
+                else:
+                    state.description, state.rows = conn.description, conn.fetchall()
+                state.status = QueryStatus.SUCCESS
+            except Exception as e:
+                state.error = e
+                state.status = QueryStatus.FAILED_WITH_ERROR
+            finally:
+                conn.close()
+
+        threading.Thread(target=run, name=f"local-query-{sfqid[:8]}", daemon=True).start()
+        return sfqid
+
+    def async_query(self, sfqid: str) -> _AsyncQuery:
+        with self._lock:
+            state = self._async_queries.get(sfqid)
+        if state is None:
+            raise ValueError(f"Unknown query id {sfqid}")
+        return state
+
+
+class LocalCursor:
+    """The subset of ``SnowflakeCursor`` that ``SnowflakeService`` uses, backed by DuckDB."""
+
+    def __init__(self, connection: "LocalConnection"):
+        self._connection = connection
+        self._engine = connection.engine
+        self.sfqid: Optional[str] = None
+        self.description: Optional[List[Tuple]] = None
+        self._rows: Optional[Iterator[Tuple]] = None
+
+    def execute(self, query: str, params: Optional[Dict[str, Any]] = None, _statement_params=None, **kwargs):
+        self.sfqid = str(uuid.uuid4())
+        answered = self._engine.execute(self._connection.duck, query, params)
+        if answered is not None:
+            self.description, rows = answered
+            self._rows = iter(rows)
+        else:
+            self.description = self._connection.duck.description
+            self._rows = None
+        return self
+
+    def execute_async(self, query: str, params: Optional[Dict[str, Any]] = None, _statement_params=None, **kwargs):
+        self.sfqid = self._engine.submit(query, params)
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid: str):
+        state = self._engine.async_query(sfqid)
+        while state.status is QueryStatus.RUNNING:
+            time.sleep(0.05)
+        if state.error is not None:
+            raise state.error
+        self.sfqid = sfqid
+        self.description = state.description
+        self._rows = iter(state.rows)
+
+    def fetchall(self) -> List[Tuple]:
+        if self._rows is None:
+            return self._connection.duck.fetchall()
+        return list(self._rows)
+
+    def fetchmany(self, size: int = 1) -> List[Tuple]:
+        if self._rows is None:
+            return self._connection.duck.fetchmany(size)
+        return [row for _, row in zip(range(size), self._rows)]
+
+    def fetch_arrow_batches(self):
+        import pyarrow  # noqa: F401 - raise ImportError before any rows are consumed
+
+        if self._rows is None:
+            reader = self._connection.duck.fetch_record_batch()
+            yield from reader
+        else:
+            columns = [column[0] for column in self.description]
+            rows = list(self._rows)
+            yield from pyarrow.table({name: [row[i] for row in rows] for i, name in enumerate(columns)}).to_batches()
+
+    def get_result_batches(self) -> List["LocalResultBatch"]:
+        rows = self.fetchall()
+        return [
+            LocalResultBatch(rows[start:start + RESULT_BATCH_ROWS])
+            for start in range(0, len(rows), RESULT_BATCH_ROWS)
+        ]
+
+    def close(self):
+        self._rows = None
+
+
+class LocalResultBatch:
+    """Stands in for the connector's ``ResultBatch``: rows that can be read without the connection."""
+
+    def __init__(self, rows: List[Tuple]):
+        self.rowcount = len(rows)
+        self._rows = rows
+
+    def create_iter(self) -> Iterator[Tuple]:
+        return iter(self._rows)
+
+
+class LocalConnection:
+    """The subset of ``SnowflakeConnection`` that ``SnowflakeService`` uses, backed by DuckDB."""
+
+    def __init__(self, engine: LocalEngine):
+        self.engine = engine
+        self.duck = engine.connect()
+        self.host = "localhost"
+        self._closed = False
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self)
+
+    def get_query_status(self, sfqid: str) -> QueryStatus:
+        return self.engine.async_query(sfqid).status
+
+    def get_query_status_throw_if_error(self, sfqid: str) -> QueryStatus:
+        state = self.engine.async_query(sfqid)
+        if state.error is not None:
+            raise state.error
+        return state.status
+
+    @staticmethod
+    def is_still_running(status: QueryStatus) -> bool:
+        return status is QueryStatus.RUNNING
+
+    @staticmethod
+    def is_an_error(status: QueryStatus) -> bool:
+        return status is QueryStatus.FAILED_WITH_ERROR
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.duck.close()
+
+
+class LocalSnowflakeService(SnowflakeService):
+    """``SnowflakeService`` whose connections run the API's SQL on an embedded DuckDB database.
+
+    Selected with ``SNOWFLAKE_BACKEND=local``. Pools, workload admission,
+    caches, metrics and query tags all run unchanged, so every route can be
+    load-tested and profiled without a Snowflake account. ``LOCAL_QUERY_LATENCY_MS``
+    adds a simulated round trip to every statement and agent call. The Cortex
+    Agent is replaced by a canned answer streamed as SSE.
+    """
+
+    def __init__(self):
+        self._engine = LocalEngine(
+            data_dir=Path(os.getenv("LOCAL_DATA_DIR", str(DEFAULT_DATA_DIR))),
+            seed_scale=int(os.getenv("LOCAL_SEED_SCALE", "1")),
+            backfill_seconds=int(os.getenv("LOCAL_SENSOR_BACKFILL_SECONDS", "600")),
+            latency_ms=float(os.getenv("LOCAL_QUERY_LATENCY_MS", "0")),
+        )
+        super().__init__()
+        self.connection_name = "local"
+
+    def _connect(self, warehouse: Optional[str] = None) -> LocalConnection:
+        return LocalConnection(self._engine)
+
+    def close(self):
+        super().close()
+        self._engine.close()
+
+    def get_api_token(self, force_refresh: bool = False) -> str:
+        return "local"
+
+    def get_account_url(self) -> str:
+        return "http://localhost"
+
+    def _open_agent_stream(self, user_message: str) -> requests.Response:
+        text = (
+            "The Cortex Agent is not available with SNOWFLAKE_BACKEND=local. "
+            f"This is a canned reply to: {user_message}"
+        )
+        events = "".join(
+            f"event: response.text.delta\ndata: {json.dumps({'text': word + ' '})}\n\n" for word in text.split()
+        )
+        self._engine.simulate_latency()
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response.raw = io.BytesIO(events.encode("utf-8"))
+        self._record_agent(calls=1)
+        return response
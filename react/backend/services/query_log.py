@@ -0,0 +1,76 @@
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+
+def fingerprint(query: str) -> str:
+    """Stable short id for a statement's text, independent of whitespace."""
+    return hashlib.sha1(" ".join(query.split()).encode("utf-8")).hexdigest()[:16]
+
+
+class SlowQueryLog:
+    """The ``size`` slowest queries seen in the last ``window_seconds``.
+
+    Kept as a min-heap on duration, so recording a query that is faster than
+    everything retained is a single comparison.
+    """
+
+    def __init__(self, size: int = 50, window_seconds: float = 3600):
+        self.size = size
+        self.window_seconds = window_seconds
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _prune_locked(self, now: float):
+        cutoff = now - self.window_seconds
+        if any(entry[2] < cutoff for entry in self._heap):
+            self._heap = [entry for entry in self._heap if entry[2] >= cutoff]
+            heapq.heapify(self._heap)
+
+    def record(
+        self,
+        query: str,
+        duration_ms: float,
+        sfqid: Optional[str] = None,
+        rows: Optional[int] = None,
+        execute_ms: Optional[float] = None,
+        fetch_ms: Optional[float] = None,
+        route: Optional[str] = None,
+        request_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._heap) >= self.size and duration_ms <= self._heap[0][0]:
+                self._prune_locked(now)
+                if len(self._heap) >= self.size:
+                    return
+            entry = {
+                "sfqid": sfqid,
+                "fingerprint": fingerprint(query),
+                "sql": " ".join(query.split())[:500],
+                "duration_ms": round(duration_ms, 1),
+                "execute_ms": round(execute_ms, 1) if execute_ms is not None else None,
+                "fetch_ms": round(fetch_ms, 1) if fetch_ms is not None else None,
+                "rows": rows,
+                "route": route,
+                "request_id": request_id,
+                "error": error,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }
+            item = (duration_ms, next(self._seq), now, entry)
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            else:
+                heapq.heapreplace(self._heap, item)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Retained queries, slowest first."""
+        with self._lock:
+            self._prune_locked(time.monotonic())
+            return [item[3] for item in sorted(self._heap, key=lambda item: item[0], reverse=True)]
@@ -0,0 +1,70 @@
+import contextvars
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class RequestContext:
+    """Identifies the work a Snowflake query is done for: a request id and its route.
+
+    ``scope`` is the live ASGI scope, so ``route`` resolves to the route
+    template once the router has matched the request.
+    """
+
+    def __init__(self, request_id: str, scope: Optional[Dict[str, Any]] = None, route: Optional[str] = None):
+        self.request_id = request_id
+        self._scope = scope
+        self._route = route
+
+    @property
+    def route(self) -> Optional[str]:
+        if self._route is None and self._scope is not None:
+            route = self._scope.get("route")
+            return getattr(route, "path", None) or self._scope.get("path")
+        return self._route
+
+
+_current: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar("request_context", default=None)
+
+
+def current() -> Optional[RequestContext]:
+    return _current.get()
+
+
+@contextmanager
+def background(name: str) -> Iterator[RequestContext]:
+    """Attribute queries in this block to a background job instead of whichever request started it."""
+    context = RequestContext(f"{name}-{uuid.uuid4().hex[:12]}", route=name)
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+class RequestContextMiddleware:
+    """Give each HTTP request an id (from ``X-Request-ID`` or generated) and echo it in the response."""
+
+    header = b"x-request-id"
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(self.header, b"").decode("latin-1")[:64]
+        context = RequestContext(incoming or uuid.uuid4().hex, scope)
+
+        async def send_with_id(message: Any):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (self.header, context.request_id.encode("latin-1"))]
+            await send(message)
+
+        token = _current.set(context)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
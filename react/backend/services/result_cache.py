@@ -0,0 +1,229 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(query: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    """Cache key for a query and its bind parameters."""
+    normalized = " ".join(query.split())
+    return normalized, json.dumps(params or {}, sort_keys=True, default=str)
+
+
+# Rows serialized per list when sizing a result; the rest are assumed similar.
+SIZE_SAMPLE_ROWS = 8
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate serialized size of ``value`` from a few evenly spaced rows per list.
+
+    Runs on the event loop for every cache fill, so it must not walk the whole
+    result. Columnar results are sized column by column.
+    """
+    if isinstance(value, list):
+        if len(value) <= SIZE_SAMPLE_ROWS:
+            return len(json.dumps(value, default=str))
+        sample = value[:: len(value) // SIZE_SAMPLE_ROWS][:SIZE_SAMPLE_ROWS]
+        return len(json.dumps(sample, default=str)) * len(value) // len(sample)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + estimate_size(item) for key, item in value.items()) + 2
+    return len(json.dumps(value, default=str))
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "expires_at", "stale_until", "size", "version")
+
+    def __init__(
+        self,
+        value: Any,
+        loaded_at: float,
+        expires_at: float,
+        stale_until: float,
+        size: int,
+        version: Optional[Hashable] = None,
+    ):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+        self.version = version
+
+
+class CachedResult:
+    """A cached value with its age in seconds, whether it is past its TTL, and the data version it was loaded at."""
+
+    __slots__ = ("value", "age", "stale", "version")
+
+    def __init__(self, value: Any, age: float, stale: bool, version: Optional[Hashable] = None):
+        self.value = value
+        self.age = age
+        self.stale = stale
+        self.version = version
+
+
+class ResultCache:
+    """In-process TTL cache for query results with LRU eviction and a memory cap.
+
+    Concurrent misses for the same key share a single load: the first caller
+    runs the loader and everyone else awaits its result. Cached values are
+    shared between callers and must be treated as read-only.
+
+    With ``max_stale`` set, an expired entry is still returned for up to that
+    many seconds past its TTL while a background task reloads it
+    (stale-while-revalidate). Once it is older than that, callers wait for a
+    fresh load and see its error if it fails.
+
+    Callers that know the current ``version`` of the source data pass it in;
+    an entry loaded at a different version counts as expired even within its
+    TTL.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "stale_hits": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "uncacheable": 0,
+        }
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        return (await self.get_or_load_result(key, ttl, loader)).value
+
+    async def get_or_load_result(
+        self,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        max_stale: float = 0,
+        version: Optional[Hashable] = None,
+    ) -> CachedResult:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            current = version is None or entry.version == version
+            if current and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return CachedResult(entry.value, now - entry.loaded_at, stale=False, version=entry.version)
+            if max_stale and entry.stale_until > now:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._refresh_in_background(key, ttl, loader, max_stale, version)
+                return CachedResult(entry.value, now - entry.loaded_at, stale=True, version=entry.version)
+            self._remove(key)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._stats["coalesced"] += 1
+            value = await asyncio.shield(pending)
+            loaded = self._entries.get(key)
+            loaded_version = loaded.version if loaded is not None else None
+            # A load that started at an older data version answers this caller stale.
+            stale = version is not None and loaded_version != version
+            return CachedResult(value, 0.0, stale=stale, version=loaded_version)
+
+        self._stats["misses"] += 1
+        return CachedResult(await self._load(key, ttl, loader, max_stale, version), 0.0, stale=False, version=version)
+
+    def _refresh_in_background(
+        self,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        max_stale: float,
+        version: Optional[Hashable],
+    ):
+        async def refresh():
+            try:
+                await self._load(key, ttl, loader, max_stale, version)
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                logger.warning(f"Background refresh failed; still serving stale result: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _load(
+        self,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        max_stale: float,
+        version: Optional[Hashable] = None,
+    ) -> Any:
+        # The load runs in its own task so that cancelling the caller that
+        # started it only cancels that caller's wait; requests coalesced onto
+        # the same load still get its result.
+        async def load():
+            try:
+                value = await loader()
+                self._store(key, value, ttl, max_stale, version)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        # Retrieve the exception so a load nobody is waiting for doesn't log a warning.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task)
+
+    def _store(self, key: Hashable, value: Any, ttl: float, max_stale: float = 0, version: Optional[Hashable] = None):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self._stats["uncacheable"] += 1
+            logger.warning(f"Result of {size} bytes exceeds cache cap; not caching")
+            return
+        self._remove(key)
+        now = time.monotonic()
+        self._entries[key] = _Entry(value, now, now + ttl, now + ttl + max_stale, size, version)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, key: Hashable):
+        """Drop ``key`` so the next lookup loads it again."""
+        self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self._stats[name] for name in ("hits", "stale_hits", "misses", "coalesced"))
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else None,
+            **self._stats,
+        }
@@ -0,0 +1,210 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pivoted metric columns, in the order the live-sensor queries return them.
+METRIC_COLUMNS = ("TEMPERATURE_C", "HUMIDITY_PCT", "PRESSURE_PSI", "VIBRATION_G", "VACUUM_MBAR")
+
+# (warning, critical) levels for the one-minute average of each metric, matching
+# check_live_anomalies in the Streamlit app.
+THRESHOLDS = {
+    "HUMIDITY_PCT": (60, 70),
+    "VACUUM_MBAR": (-0.92, -0.88),
+    "VIBRATION_G": (0.5, 0.8),
+    "TEMPERATURE_C": (200, 220),
+}
+
+Row = Dict[str, Any]
+
+
+def _to_datetime64(value: datetime) -> np.datetime64:
+    return np.datetime64(value.replace(tzinfo=None), "us")
+
+
+class AssetRingBuffer:
+    """Fixed-capacity ring of pivoted sensor readings for one asset.
+
+    Timestamps and metric values live in preallocated NumPy arrays (one float
+    row per metric), so appending never allocates and memory per asset is
+    constant.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.event_times = np.zeros(capacity, dtype="datetime64[us]")
+        self.ingestion_times = np.zeros(capacity, dtype="datetime64[us]")
+        self.values = np.full((len(METRIC_COLUMNS), capacity), np.nan, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self.event_times.nbytes + self.ingestion_times.nbytes + self.values.nbytes
+
+    def append(self, row: Row):
+        i = self._next
+        self.event_times[i] = _to_datetime64(row["EVENT_TIME"])
+        self.ingestion_times[i] = _to_datetime64(row["INGESTION_TIME"])
+        for m, column in enumerate(METRIC_COLUMNS):
+            value = row.get(column)
+            self.values[m, i] = np.nan if value is None else float(value)
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def select(self, ingested_after: np.datetime64) -> np.ndarray:
+        """Slot indices ingested after ``ingested_after``, newest event first."""
+        slots = np.arange(self._next - self._size, self._next) % self.capacity
+        slots = slots[self.ingestion_times[slots] > ingested_after]
+        return slots[np.argsort(self.event_times[slots], kind="stable")[::-1]]
+
+
+class SensorBufferStore:
+    """Per-asset ring buffers of recent live readings, fed incrementally from IOT_STREAMING_LIVE.
+
+    The store is cold until ``mark_refreshed`` is called after the first
+    backfill, and callers should fall back to Snowflake unless ``fresh()``;
+    that also covers the poller failing for longer than ``max_age``.
+    "Now" is estimated as the newest ingestion time plus the wall-clock time
+    elapsed since it was seen, which keeps window cutoffs in the same
+    (session) time zone as INGESTION_TIME.
+    """
+
+    def __init__(self, capacity: int = 300):
+        self.capacity = capacity
+        self._buffers: Dict[str, AssetRingBuffer] = {}
+        self._newest: Optional[datetime] = None
+        self._newest_seen_at = 0.0
+        self.warm = False
+        self._refreshed_at = 0.0
+        self._rows_ingested = 0
+
+    def mark_refreshed(self):
+        """Record a successful poll; the first call marks the backfill complete."""
+        if not self.warm:
+            logger.info(f"Sensor buffers warm: {self._rows_ingested} rows across {len(self._buffers)} assets")
+        self.warm = True
+        self._refreshed_at = time.monotonic()
+
+    def fresh(self, max_age: float) -> bool:
+        return self.warm and time.monotonic() - self._refreshed_at <= max_age
+
+    def ingest(self, rows: List[Row]):
+        for row in sorted(rows, key=lambda r: r["INGESTION_TIME"]):
+            buffer = self._buffers.get(row["ASSET_ID"])
+            if buffer is None:
+                buffer = self._buffers[row["ASSET_ID"]] = AssetRingBuffer(self.capacity)
+            buffer.append(row)
+            if self._newest is None or row["INGESTION_TIME"] > self._newest:
+                self._newest = row["INGESTION_TIME"]
+                self._newest_seen_at = time.monotonic()
+        self._rows_ingested += len(rows)
+
+    def _cutoff(self, window_seconds: float, since: Optional[datetime]) -> np.datetime64:
+        if self._newest is None:
+            return np.datetime64("9999-01-01", "us")
+        now = self._newest + timedelta(seconds=time.monotonic() - self._newest_seen_at)
+        cutoff = _to_datetime64(now - timedelta(seconds=window_seconds))
+        return max(cutoff, _to_datetime64(since)) if since else cutoff
+
+    def by_asset(self, window_seconds: float = 30, since: Optional[datetime] = None) -> List[Row]:
+        """Same rows and order as the /api/live-sensors-by-asset query."""
+        cutoff = self._cutoff(window_seconds, since)
+        rows: List[Row] = []
+        for asset_id in sorted(self._buffers):
+            buffer = self._buffers[asset_id]
+            slots = buffer.select(cutoff)
+            event_times = buffer.event_times[slots].tolist()
+            ingestion_times = buffer.ingestion_times[slots].tolist()
+            values = buffer.values[:, slots]
+            for k in range(len(slots)):
+                row = {"ASSET_ID": asset_id, "EVENT_TIME": event_times[k]}
+                for m, column in enumerate(METRIC_COLUMNS):
+                    value = values[m, k]
+                    row[column] = None if np.isnan(value) else float(value)
+                row["INGESTION_TIME"] = ingestion_times[k]
+                rows.append(row)
+        return rows
+
+    def by_event_time(
+        self,
+        window_seconds: float = 30,
+        since: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> List[Row]:
+        """Same rows and order as the /api/live-sensors query: per-metric MAX across assets per event time."""
+        cutoff = self._cutoff(window_seconds, since)
+        selections = [(buffer, buffer.select(cutoff)) for buffer in self._buffers.values()]
+        selections = [(buffer, slots) for buffer, slots in selections if len(slots)]
+        if not selections:
+            return []
+        event_times = np.concatenate([buffer.event_times[slots] for buffer, slots in selections])
+        ingestion_times = np.concatenate([buffer.ingestion_times[slots] for buffer, slots in selections])
+        values = np.concatenate([buffer.values[:, slots] for buffer, slots in selections], axis=1)
+
+        unique_times, groups = np.unique(event_times, return_inverse=True)
+        maxima = np.full((len(METRIC_COLUMNS), len(unique_times)), np.nan)
+        for m in range(len(METRIC_COLUMNS)):
+            np.fmax.at(maxima[m], groups, values[m])
+        latest_ingestion = np.full(len(unique_times), np.datetime64("NaT", "us"))
+        np.fmax.at(latest_ingestion, groups, ingestion_times)
+
+        rows: List[Row] = []
+        for g in range(len(unique_times) - 1, max(len(unique_times) - 1 - limit, -1), -1):
+            row = {"EVENT_TIME": unique_times[g].tolist()}
+            for m, column in enumerate(METRIC_COLUMNS):
+                value = maxima[m, g]
+                row[column] = None if np.isnan(value) else float(value)
+            row["INGESTION_TIME"] = latest_ingestion[g].tolist()
+            rows.append(row)
+        return rows
+
+    def threshold_status(self, window_seconds: float = 60) -> List[Dict[str, Any]]:
+        """Per-asset average of each metric over the window, graded against THRESHOLDS."""
+        cutoff = self._cutoff(window_seconds, None)
+        results = []
+        for asset_id in sorted(self._buffers):
+            buffer = self._buffers[asset_id]
+            slots = buffer.select(cutoff)
+            if not len(slots):
+                continue
+            metrics = {}
+            status = "OK"
+            for m, column in enumerate(METRIC_COLUMNS):
+                window = buffer.values[m, slots]
+                if np.isnan(window).all():
+                    continue
+                average = float(np.nanmean(window))
+                metric_status = "OK"
+                if column in THRESHOLDS:
+                    warn, crit = THRESHOLDS[column]
+                    if average > crit:
+                        metric_status = "CRITICAL"
+                    elif average > warn:
+                        metric_status = "WARNING"
+                metrics[column] = {"avg": round(average, 2), "status": metric_status}
+                if metric_status == "CRITICAL" or (metric_status == "WARNING" and status == "OK"):
+                    status = metric_status
+            results.append({"asset_id": asset_id, "status": status, "metrics": metrics})
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "warm": self.warm,
+            "seconds_since_refresh": round(time.monotonic() - self._refreshed_at, 1) if self.warm else None,
+            "capacity_per_asset": self.capacity,
+            "rows_ingested": self._rows_ingested,
+            "newest_ingestion": self._newest.isoformat() if self._newest else None,
+            "assets": {
+                asset_id: {"readings": len(buffer), "bytes": buffer.nbytes}
+                for asset_id, buffer in sorted(self._buffers.items())
+            },
+            "total_bytes": sum(buffer.nbytes for buffer in self._buffers.values()),
+        }
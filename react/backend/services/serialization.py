@@ -0,0 +1,154 @@
+import datetime
+import functools
+import gzip
+import json
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional speedup
+    brotli = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert the non-JSON types our queries and buffers produce.
+
+    Decimals follow ``jsonable_encoder``: integral values become ints, the rest floats.
+    """
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight from query rows, without ``jsonable_encoder``.
+
+    Uses orjson when it is installed and handles Decimal, datetime and NumPy
+    values natively either way.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """Route whose plain return values are rendered by ``FastJSONResponse`` as-is.
+
+    FastAPI would otherwise validate the value against ``response_model`` and
+    walk it with ``jsonable_encoder`` before rendering, which dominates the cost
+    of large row payloads. ``response_model`` still documents the schema.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        status_code = kwargs.get("status_code") or 200
+
+        @functools.wraps(endpoint)
+        async def render_directly(*args: Any, **kw: Any) -> Any:
+            result = await endpoint(*args, **kw)
+            return result if isinstance(result, Response) else FastJSONResponse(result, status_code=status_code)
+
+        super().__init__(path, render_directly, **kwargs)
+
+
+class CompressionMiddleware:
+    """Brotli- or gzip-compress complete JSON responses of at least ``minimum_size`` bytes.
+
+    Brotli is used when the client accepts it and the ``brotli`` package is
+    installed. Streaming responses (SSE, NDJSON) are passed through untouched so
+    events are never held back by the compressor.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, scope: Any) -> Any:
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Any, receive: Any, send: Any):
+        encoding = self._encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message: Any):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                pending, start = start, None
+                headers = MutableHeaders(scope=pending)
+                body = message.get("body", b"")
+                if (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "json" in headers.get("content-type", "")
+                    and "content-encoding" not in headers
+                ):
+                    body = self._compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+                await send(pending)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -1,77 +1,611 @@
 import os
 import json
+import time
+import asyncio
+import contextvars
+import functools
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import snowflake.connector
-from typing import List, Dict, Any, Optional
+from snowflake.connector.errors import NotSupportedError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Tuple, Hashable
 import logging
 
+from services.connection_pool import ConnectionPool
+from services.concurrency import PriorityAdmission
+from services.result_cache import CachedResult, ResultCache, estimate_size, make_key
+from services.answer_cache import AnswerCache
+from services.metrics import REGISTRY, SIZE_BUCKETS
+from services.query_log import SlowQueryLog
+from services import request_context
+
 logger = logging.getLogger(__name__)
 
 AGENT_DATABASE = "SNOWCORE_PDM"
 AGENT_SCHEMA = "PDM"
 AGENT_NAME = "RELIABILITY_COPILOT"
 
+# High-water marks of the tables the Copilot's answers depend on. MAX and COUNT
+# are answered from table metadata, so this is cheap to run before each chat.
+ANSWER_FINGERPRINT_QUERY = """
+SELECT
+    (SELECT MAX(TIMESTAMP) FROM SNOWCORE_PDM.PDM.FAILURE_PROBABILITY) AS FAILURE_PROBABILITY_AT,
+    (SELECT MAX(CREATED_AT) FROM SNOWCORE_PDM.PDM.ANOMALY_EVENTS) AS ANOMALY_EVENTS_AT,
+    (SELECT COUNT(*) FROM SNOWCORE_PDM.PDM.ANOMALY_EVENTS) AS ANOMALY_EVENTS_COUNT
+"""
+ANSWER_FINGERPRINT_TTL = 15
+
+QUERY_TAG_APP = "snowcore-copilot"
+
+# Errors after which a connection's session can no longer be used, although
+# is_closed() still reports it open: incorrect credentials (390100), session
+# gone (390111) or expired (390112), master token expired (390114) and invalid
+# key-pair JWT (390144).
+SESSION_ERRNOS = frozenset({390100, 390111, 390112, 390114, 390144})
+
+
+def _is_session_error(error: Exception) -> bool:
+    return getattr(error, "errno", None) in SESSION_ERRNOS
+
+
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "snowflake_pool_wait_seconds",
+    "Time spent waiting to check out a pooled Snowflake connection.",
+    ("workload",),
+)
+QUERY_EXECUTE_SECONDS = REGISTRY.histogram(
+    "snowflake_query_execute_seconds",
+    "Time in cursor.execute, i.e. until Snowflake has run the query.",
+    ("fetch",),
+)
+QUERY_FETCH_SECONDS = REGISTRY.histogram(
+    "snowflake_query_fetch_seconds",
+    "Time spent downloading and converting the result set.",
+    ("fetch",),
+)
+QUERY_ROWS = REGISTRY.counter("snowflake_query_rows_total", "Rows returned by Snowflake queries.", ("fetch",))
+QUERY_RESULT_BYTES = REGISTRY.histogram(
+    "snowflake_query_result_bytes",
+    "Approximate serialized size of each query result, estimated from sampled rows.",
+    ("fetch",),
+    buckets=SIZE_BUCKETS,
+)
+# By route as well, so endpoints that answer a failed query with an empty 200
+# still show their failures.
+QUERY_ERRORS = REGISTRY.counter(
+    "snowflake_query_errors_total",
+    "Failed Snowflake queries by route and exception type.",
+    ("route", "error"),
+)
+AGENT_TTFB_SECONDS = REGISTRY.histogram(
+    "cortex_agent_ttfb_seconds",
+    "Time from sending the Cortex Agent request until response headers arrive.",
+)
+AGENT_TTFT_SECONDS = REGISTRY.histogram(
+    "cortex_agent_first_token_seconds",
+    "Time from starting a Cortex Agent call until its first text delta.",
+)
+AGENT_ERRORS = REGISTRY.counter("cortex_agent_errors_total", "Failed Cortex Agent calls by kind.", ("kind",))
+
+
+# Workload classes: (priority, default pool size, default concurrency limit).
+# Lower priority numbers are admitted first. The default limits of chat and
+# analytic together stay below SNOWFLAKE_MAX_CONCURRENT_QUERIES, so live
+# telemetry always has a slot.
+WORKLOADS = {
+    "live": (0, 4, 4),
+    "chat": (1, 2, 3),
+    "analytic": (2, 8, 6),
+}
+
+
+class Workload:
+    """Connection pool, executor threads and optional warehouse for one workload class."""
+
+    def __init__(
+        self,
+        name: str,
+        pool: ConnectionPool,
+        executor: ThreadPoolExecutor,
+        limit: int,
+        warehouse: Optional[str],
+    ):
+        self.name = name
+        self.pool = pool
+        self.limit = limit
+        self.executor = executor
+        self.warehouse = warehouse
+
+
+def _row_count(result: Any) -> int:
+    if isinstance(result, dict):
+        columns = result["columns"]
+        return len(result["data"][columns[0]]) if columns else 0
+    return len(result)
+
 
 class SnowflakeService:
     def __init__(self):
         self.connection_name = os.getenv("SNOWFLAKE_CONNECTION_NAME", "demo")
         self.database = os.getenv("SNOWFLAKE_DATABASE", "SNOWCORE_PDM")
         self.schema = os.getenv("SNOWFLAKE_SCHEMA", "PDM")
-        self._connection: Optional[snowflake.connector.SnowflakeConnection] = None
-
-    def _get_connection(self) -> snowflake.connector.SnowflakeConnection:
-        if self._connection is None or self._connection.is_closed():
-            logger.info(f"Connecting to Snowflake with connection: {self.connection_name}")
-            self._connection = snowflake.connector.connect(
-                connection_name=self.connection_name,
-                database=self.database,
-                schema=self.schema,
+        self._admission = PriorityAdmission(
+            total=int(os.getenv("SNOWFLAKE_MAX_CONCURRENT_QUERIES", "10")),
+            max_wait=float(os.getenv("SNOWFLAKE_POOL_WAIT_SECONDS", "10")),
+        )
+        self._workloads: Dict[str, Workload] = {}
+        # Connections held open regardless of idleness are only worth it when
+        # warm start opens them; otherwise every pool may shrink to nothing.
+        warm_start = os.getenv("WARM_START", "false").lower() in ("1", "true", "yes")
+        for name, (priority, pool_size, limit) in WORKLOADS.items():
+            prefix = f"WORKLOAD_{name.upper()}_"
+            # SNOWFLAKE_POOL_SIZE predates workload classes and still sizes the analytic pool.
+            default_size = os.getenv("SNOWFLAKE_POOL_SIZE", str(pool_size)) if name == "analytic" else str(pool_size)
+            warehouse = os.getenv(prefix + "WAREHOUSE") or None
+            pool = ConnectionPool(
+                functools.partial(self._connect, warehouse),
+                max_size=int(os.getenv(prefix + "POOL_SIZE", default_size)),
+                wait_timeout=float(os.getenv("SNOWFLAKE_POOL_WAIT_SECONDS", "10")),
+                max_idle_seconds=float(os.getenv("SNOWFLAKE_POOL_MAX_IDLE_SECONDS", "300")),
+                min_size=int(os.getenv(prefix + "MIN_CONNECTIONS", "1" if warm_start else "0")),
+                max_lifetime_seconds=float(os.getenv("SNOWFLAKE_POOL_MAX_LIFETIME_SECONDS", "3600")),
+                discard_on=_is_session_error,
+            )
+            limit = int(os.getenv(prefix + "LIMIT", str(limit)))
+            # Agent calls hold a thread for the whole answer but a connection only
+            # for the token lookup, so executors are sized by the limit as well.
+            executor = ThreadPoolExecutor(
+                max_workers=max(pool.max_size, limit),
+                thread_name_prefix=f"snowflake-{name}",
             )
-        return self._connection
+            self._workloads[name] = Workload(name, pool, executor, limit, warehouse)
+            self._admission.add_class(
+                name,
+                priority,
+                limit=limit,
+                max_queue=int(os.getenv(prefix + "MAX_QUEUE", "100")),
+            )
+        self._result_cache = ResultCache(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "32")) * 1024 * 1024,
+        )
+        self._answer_cache = AnswerCache(
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "128")),
+            ttl=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "900")),
+        )
+        self._slow_queries = SlowQueryLog(
+            size=int(os.getenv("SLOW_QUERY_LOG_SIZE", "50")),
+            window_seconds=float(os.getenv("SLOW_QUERY_WINDOW_SECONDS", "3600")),
+        )
+        self._stats_lock = threading.Lock()
+        self._query_stats = {
+            "queries": 0,
+            "query_ms_total": 0.0,
+            "session_alters": 0,
+            "session_alter_ms_total": 0.0,
+            "session_alters_skipped": 0,
+        }
+        self._token_lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_refresh_margin = float(os.getenv("AGENT_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+        self._account_url: Optional[str] = None
+        # One keep-alive HTTP session for every Cortex Agent call, so chats after
+        # the first skip the TCP and TLS handshake to the account URL.
+        self._http = requests.Session()
+        self._http.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=self._workloads["chat"].limit),
+        )
+        self._agent_stats = {
+            "calls": 0,
+            "tokens_issued": 0,
+            "tokens_reused": 0,
+            "setup_ms_total": 0.0,
+            "ttfb_ms_total": 0.0,
+        }
+
+    def _connect(self, warehouse: Optional[str] = None) -> snowflake.connector.SnowflakeConnection:
+        logger.info(f"Connecting to Snowflake with connection: {self.connection_name}")
+        options = {"warehouse": warehouse} if warehouse else {}
+        return snowflake.connector.connect(
+            connection_name=self.connection_name,
+            database=self.database,
+            schema=self.schema,
+            **options,
+        )
 
     def close(self):
-        if self._connection and not self._connection.is_closed():
-            self._connection.close()
-            self._connection = None
-            logger.info("Snowflake connection closed")
+        self._http.close()
+        for workload in self._workloads.values():
+            workload.executor.shutdown(wait=False, cancel_futures=True)
+            workload.pool.close()
+        logger.info("Snowflake connection pools closed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            query_stats = dict(self._query_stats)
+            agent_stats = dict(self._agent_stats)
+        calls = agent_stats["calls"]
+        agent_stats["avg_setup_ms"] = round(agent_stats["setup_ms_total"] / calls, 1) if calls else None
+        agent_stats["avg_ttfb_ms"] = round(agent_stats["ttfb_ms_total"] / calls, 1) if calls else None
+        alters = query_stats["session_alters"]
+        avg_alter_ms = query_stats["session_alter_ms_total"] / alters if alters else 0.0
+        query_stats["round_trips_saved"] = query_stats["session_alters_skipped"]
+        query_stats["estimated_ms_saved"] = round(avg_alter_ms * query_stats["session_alters_skipped"], 1)
+        admission = self._admission.stats()
+        return {
+            "workloads": {
+                name: {
+                    "warehouse": workload.warehouse,
+                    "pool": workload.pool.stats(),
+                    **admission["classes"][name],
+                }
+                for name, workload in self._workloads.items()
+            },
+            "admission": {"total": admission["total"], "in_flight": admission["in_flight"]},
+            "queries": query_stats,
+            "result_cache": self._result_cache.stats(),
+            "agent": agent_stats,
+            "answer_cache": self._answer_cache.stats(),
+        }
+
+    def _record(self, **increments: float):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._query_stats[key] += value
+
+    def _record_agent(self, **increments: float):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._agent_stats[key] += value
+
+    def _apply_statement_timeout(self, pooled, cursor, timeout: int):
+        """Set STATEMENT_TIMEOUT_IN_SECONDS only if this session is not already at that value."""
+        if pooled.session_params.get("STATEMENT_TIMEOUT_IN_SECONDS") == timeout:
+            self._record(session_alters_skipped=1)
+            return
+        start = time.perf_counter()
+        cursor.execute(f"ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = {int(timeout)}")
+        pooled.session_params["STATEMENT_TIMEOUT_IN_SECONDS"] = timeout
+        self._record(session_alters=1, session_alter_ms_total=(time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _query_tag(workload: str) -> Dict[str, Any]:
+        """QUERY_TAG linking the statement to the API request that issued it."""
+        context = request_context.current()
+        tag = {"app": QUERY_TAG_APP, "workload": workload}
+        if context is not None:
+            tag["route"] = context.route
+            tag["request_id"] = context.request_id
+        return tag
+
+    def _run(self, query: str, params: Optional[Dict[str, Any]], timeout: int, fetch, workload: str):
+        kind = "columnar" if fetch is self._fetch_columns else "rows"
+        tag = self._query_tag(workload)
+        wait_start = time.perf_counter()
+        with self._workloads[workload].pool.connection() as pooled:
+            start = time.perf_counter()
+            POOL_WAIT_SECONDS.observe(start - wait_start, workload)
+            cursor = pooled.connection.cursor()
+            executed = None
+            try:
+                self._apply_statement_timeout(pooled, cursor, timeout)
+
+                statement_params = {"QUERY_TAG": json.dumps(tag)}
+                start = time.perf_counter()
+                if params:
+                    cursor.execute(query, params, _statement_params=statement_params)
+                else:
+                    cursor.execute(query, _statement_params=statement_params)
+                executed = time.perf_counter()
+
+                result = fetch(cursor)
+                fetched = time.perf_counter()
+                rows = _row_count(result)
+                QUERY_EXECUTE_SECONDS.observe(executed - start, kind)
+                QUERY_FETCH_SECONDS.observe(fetched - executed, kind)
+                QUERY_ROWS.inc(kind, amount=rows)
+                QUERY_RESULT_BYTES.observe(estimate_size(result), kind)
+                self._record(queries=1, query_ms_total=(fetched - start) * 1000)
+                logger.debug(
+                    f"Query {cursor.sfqid} for {tag.get('route')} ({tag.get('request_id')}): "
+                    f"{(fetched - start) * 1000:.0f} ms, {rows} rows"
+                )
+                self._slow_queries.record(
+                    query,
+                    (fetched - start) * 1000,
+                    sfqid=cursor.sfqid,
+                    rows=rows,
+                    execute_ms=(executed - start) * 1000,
+                    fetch_ms=(fetched - executed) * 1000,
+                    route=tag.get("route"),
+                    request_id=tag.get("request_id"),
+                )
+                return result
+            except Exception as e:
+                QUERY_ERRORS.inc(tag.get("route") or "unknown", type(e).__name__)
+                self._slow_queries.record(
+                    query,
+                    (time.perf_counter() - start) * 1000,
+                    sfqid=getattr(cursor, "sfqid", None),
+                    execute_ms=(executed - start) * 1000 if executed else None,
+                    route=tag.get("route"),
+                    request_id=tag.get("request_id"),
+                    error=str(e)[:500],
+                )
+                raise
+            finally:
+                cursor.close()
+
+    def slow_queries(self) -> Dict[str, Any]:
+        return {
+            "queries": self._slow_queries.entries(),
+            "size": self._slow_queries.size,
+            "window_seconds": self._slow_queries.window_seconds,
+        }
+
+    @staticmethod
+    def _fetch_rows(cursor) -> List[Dict[str, Any]]:
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _fetch_columns(cursor) -> Dict[str, Any]:
+        columns = [col[0] for col in cursor.description]
+        data: Dict[str, List[Any]] = {name: [] for name in columns}
+        try:
+            for batch in cursor.fetch_arrow_batches():
+                for name, values in zip(batch.column_names, batch.columns):
+                    data[name].extend(values.to_pylist())
+        except (ImportError, NotSupportedError):
+            # SHOW/DESCRIBE results are not Arrow-formatted, and pyarrow is optional.
+            for row in cursor.fetchall():
+                for name, value in zip(columns, row):
+                    data[name].append(value)
+        return {"columns": columns, "data": data}
 
     def execute_query(
         self,
         query: str,
         params: Optional[Dict[str, Any]] = None,
         timeout: int = 60,
+        workload: str = "analytic",
     ) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(f"ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = {timeout}")
+        return self._run(query, params, timeout, self._fetch_rows, workload)
+
+    def execute_query_columnar(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 60,
+        workload: str = "analytic",
+    ) -> Dict[str, Any]:
+        """Run a query and return ``{"columns": [...], "data": {column: [values]}}``.
+
+        Built from the connector's Arrow result batches, so no per-row dict is allocated.
+        """
+        return self._run(query, params, timeout, self._fetch_columns, workload)
+
+    async def _run_blocking(self, workload: str, func, *args, **kwargs):
+        # run_in_executor does not carry contextvars over; copy them so queries
+        # are tagged with the request that issued them.
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        executor = self._workloads[workload].executor
+        return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+
+    async def prewarm_connections(self) -> Dict[str, int]:
+        """Open every workload pool's ``min_size`` connections in parallel; returns open connections per pool."""
+
+        async def prewarm(workload: Workload) -> int:
+            pool = workload.pool
+            await asyncio.gather(*(self._run_blocking(workload.name, pool.prewarm) for _ in range(pool.min_size)))
+            return pool.stats()["open"]
+
+        names = list(self._workloads)
+        opened = await asyncio.gather(*(prewarm(self._workloads[name]) for name in names))
+        return dict(zip(names, opened))
+
+    async def prewarm_agent(self):
+        """Issue the Cortex Agent token and resolve the account URL ahead of the first chat."""
+        await self._run_blocking("chat", self.get_api_token)
+        await self._run_blocking("chat", self.get_account_url)
+
+    async def execute_query_async(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 60,
+        columnar: bool = False,
+        workload: str = "analytic",
+    ) -> Any:
+        """Run execute_query (or execute_query_columnar) on the workload's executor without blocking the event loop.
+
+        Waits for an admission slot first; raises ConcurrencyLimitError if the
+        workload's queue is full or no slot frees up in time.
+        """
+        func = self.execute_query_columnar if columnar else self.execute_query
+        async with self._admission.slot(workload):
+            return await self._run_blocking(workload, func, query, params, timeout, workload)
+
+    async def execute_query_cached(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 60,
+        ttl: float = 60,
+        columnar: bool = False,
+        workload: str = "analytic",
+    ) -> Any:
+        """Like execute_query_async, but serve repeat reads from the result cache for ``ttl`` seconds.
+
+        Concurrent misses for the same query and parameters share one Snowflake query.
+        The returned rows are shared with other callers and must not be mutated.
+        """
+        return await self._result_cache.get_or_load(
+            (*make_key(query, params), columnar),
+            ttl,
+            lambda: self.execute_query_async(query, params, timeout, columnar, workload),
+        )
+
+    async def execute_query_swr(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 60,
+        ttl: float = 60,
+        max_stale: float = 0,
+        columnar: bool = False,
+        workload: str = "analytic",
+        version: Optional[Hashable] = None,
+    ) -> CachedResult:
+        """Like execute_query_cached, but keep answering from an expired result while it reloads.
+
+        Results up to ``max_stale`` seconds past their TTL are returned at once,
+        marked stale, and refreshed in the background. Older results are
+        reloaded inline, so errors surface once the data is too old to show.
+        A result loaded at a data ``version`` other than the current one is
+        treated as expired.
+        """
+        return await self._result_cache.get_or_load_result(
+            (*make_key(query, params), columnar),
+            ttl,
+            lambda: self.execute_query_async(query, params, timeout, columnar, workload),
+            max_stale=max_stale,
+            version=version,
+        )
+
+    def invalidate_cached(self, query: str, params: Optional[Dict[str, Any]] = None, columnar: bool = False):
+        """Forget the cached result of a query, e.g. after this process changed its source."""
+        self._result_cache.invalidate((*make_key(query, params), columnar))
+
+    def submit_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 900,
+    ) -> str:
+        """Start a query with execute_async and return its sfqid without waiting for it.
+
+        The pooled connection goes back to the pool as soon as Snowflake has
+        accepted the statement. The query keeps running server-side
+        (ABORT_DETACHED_QUERY is off by default) and is tracked by sfqid only.
+        """
+        statement_params = {
+            "QUERY_TAG": json.dumps(self._query_tag("analytic")),
+            "STATEMENT_TIMEOUT_IN_SECONDS": int(timeout),
+        }
+        with self._workloads["analytic"].pool.connection() as pooled:
+            cursor = pooled.connection.cursor()
+            try:
+                if params:
+                    cursor.execute_async(query, params, _statement_params=statement_params)
+                else:
+                    cursor.execute_async(query, _statement_params=statement_params)
+                return cursor.sfqid
+            finally:
+                cursor.close()
+
+    async def submit_query_async(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: int = 900,
+    ) -> str:
+        async with self._admission.slot("analytic"):
+            return await self._run_blocking("analytic", self.submit_query, query, params, timeout)
+
+    def query_status(self, sfqid: str) -> Tuple[str, str, Optional[str]]:
+        """``(state, status, error)`` of a submitted query, where state is running, succeeded or failed."""
+        with self._workloads["analytic"].pool.connection() as pooled:
+            connection = pooled.connection
+            status = connection.get_query_status(sfqid)
+            if connection.is_still_running(status):
+                return "running", status.name, None
+            if connection.is_an_error(status):
+                try:
+                    connection.get_query_status_throw_if_error(sfqid)
+                except Exception as e:
+                    return "failed", status.name, str(e)
+                return "failed", status.name, None
+            return "succeeded", status.name, None
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+    async def query_status_async(self, sfqid: str) -> Tuple[str, str, Optional[str]]:
+        return await self._run_blocking("analytic", self.query_status, sfqid)
 
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        finally:
-            cursor.close()
+    def _result_batches(self, sfqid: str) -> Tuple[List[str], List[Any]]:
+        """Column names and result batches of a finished query.
 
-    def get_api_token(self) -> str:
-        """Get a session token for REST API authentication."""
-        conn = self._get_connection()
-        token_data = conn._rest._token_request("ISSUE")
-        return token_data["data"]["sessionToken"]
+        Batches download their rows on their own, so the connection is back in
+        the pool as soon as this returns.
+        """
+        with self._workloads["analytic"].pool.connection() as pooled:
+            cursor = pooled.connection.cursor()
+            try:
+                cursor.get_results_from_sfqid(sfqid)
+                return [col[0] for col in cursor.description], cursor.get_result_batches()
+            finally:
+                cursor.close()
+
+    async def iter_query_results(self, sfqid: str, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the rows of a finished query in pages of ``page_size``, one result batch at a time.
+
+        A pooled connection is used only to list the batches, and each batch is
+        downloaded on the executor under its own analytic admission slot.
+        Neither is held while the caller consumes a page, so a slow client
+        costs a buffered batch of memory rather than warehouse capacity.
+        """
+        async with self._admission.slot("analytic"):
+            columns, batches = await self._run_blocking("analytic", self._result_batches, sfqid)
+        for batch in batches:
+            async with self._admission.slot("analytic"):
+                rows = await self._run_blocking("analytic", lambda: list(batch.create_iter()))
+            for start in range(0, len(rows), page_size):
+                yield [dict(zip(columns, row)) for row in rows[start:start + page_size]]
+
+    def get_api_token(self, force_refresh: bool = False) -> str:
+        """Get a session token for REST API authentication, reusing it until shortly before expiry."""
+        with self._token_lock:
+            if not force_refresh and self._token and time.monotonic() < self._token_expires_at:
+                self._record_agent(tokens_reused=1)
+                return self._token
+            with self._workloads["chat"].pool.connection() as pooled:
+                token_data = pooled.connection._rest._token_request("ISSUE")
+            validity = float(token_data["data"].get("validityInSecondsST") or 3600)
+            self._token = token_data["data"]["sessionToken"]
+            self._token_expires_at = time.monotonic() + max(validity - self._token_refresh_margin, 0)
+            self._record_agent(tokens_issued=1)
+            return self._token
 
     def get_account_url(self) -> str:
         """Get the Snowflake account URL for REST API calls."""
-        conn = self._get_connection()
-        host = conn.host
-        if "_" in host:
-            host = host.replace("_", "-")
-        return f"https://{host}"
+        if self._account_url is None:
+            with self._workloads["chat"].pool.connection() as pooled:
+                host = pooled.connection.host
+            if "_" in host:
+                host = host.replace("_", "-")
+            self._account_url = f"https://{host}"
+        return self._account_url
 
-    def call_cortex_agent(self, user_message: str) -> Dict[str, Any]:
-        """Call the Cortex Agent REST API and return parsed response."""
+    def _post_agent(self, api_endpoint: str, payload: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        try:
+            return self._http.post(
+                api_endpoint,
+                json=payload,
+                headers=headers,
+                stream=True,
+                timeout=60
+            )
+        except requests.RequestException:
+            AGENT_ERRORS.inc("request")
+            raise
+
+    def _open_agent_stream(self, user_message: str) -> requests.Response:
+        """POST to the Cortex Agent run endpoint and return the open SSE response."""
+        setup_start = time.perf_counter()
         token = self.get_api_token()
         account_url = self.get_account_url()
 
@@ -94,21 +628,42 @@ class SnowflakeService:
 
         logger.info(f"Calling Cortex Agent: {AGENT_NAME}")
 
-        response = requests.post(
-            api_endpoint,
-            json=payload,
-            headers=headers,
-            stream=True,
-            timeout=60
-        )
+        request_start = time.perf_counter()
+        response = self._post_agent(api_endpoint, payload, headers)
+
+        if response.status_code == 401:
+            # The session behind a cached token can end early, e.g. when its pooled
+            # connection is evicted. Re-issue once and retry.
+            response.close()
+            logger.info("Agent token rejected; issuing a new one")
+            headers["Authorization"] = f'Snowflake Token="{self.get_api_token(force_refresh=True)}"'
+            request_start = time.perf_counter()
+            response = self._post_agent(api_endpoint, payload, headers)
+
+        setup_ms = (request_start - setup_start) * 1000
+        ttfb_ms = (time.perf_counter() - request_start) * 1000
+        self._record_agent(calls=1, setup_ms_total=setup_ms, ttfb_ms_total=ttfb_ms)
+        AGENT_TTFB_SECONDS.observe(ttfb_ms / 1000)
+        logger.info(f"Cortex Agent first byte after {ttfb_ms:.0f} ms (setup {setup_ms:.0f} ms)")
 
         if response.status_code != 200:
-            logger.error(f"Agent API error {response.status_code}: {response.text}")
-            raise Exception(f"Agent API error {response.status_code}: {response.text}")
+            AGENT_ERRORS.inc(f"http_{response.status_code}")
+            with response:
+                logger.error(f"Agent API error {response.status_code}: {response.text}")
+                raise Exception(f"Agent API error {response.status_code}: {response.text}")
+        return response
 
-        text_parts = []
-        tool_calls = []
-        sources = []
+    @staticmethod
+    def _iter_agent_events(
+        response: requests.Response,
+        started: Optional[float] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Parse the agent's SSE stream into normalized ``(event_type, data)`` pairs.
+
+        Only text deltas, tool uses, tool results and errors are yielded; an error
+        event ends the stream. If ``started`` (a perf_counter value) is given, the
+        time to the first text delta is recorded.
+        """
         current_event_type = None
 
         for line in response.iter_lines(decode_unicode=True):
@@ -122,35 +677,61 @@ class SnowflakeService:
                 if data_str and data_str != "[DONE]":
                     try:
                         data = json.loads(data_str)
-                        if current_event_type == "error":
-                            error_msg = data.get("message", "Unknown error from Cortex Agent")
-                            logger.error(f"Agent error: {error_msg}")
-                            return {
-                                "response": f"The Cortex Agent encountered an error: {error_msg}",
-                                "tool_calls": [],
-                                "sources": []
-                            }
-                        if isinstance(data, dict):
-                            if current_event_type == "response.text.delta":
-                                text_parts.append(data.get("text", ""))
-                            elif current_event_type == "response.tool_use":
-                                tool_name = data.get("name", "unknown")
-                                tool_calls.append({
-                                    "name": tool_name,
-                                    "type": "cortex_analyst" if "analyst" in tool_name.lower() else "cortex_search",
-                                    "status": "complete"
-                                })
-                            elif current_event_type == "response.tool_result":
-                                content = data.get("content", [])
-                                for item in content:
-                                    if isinstance(item, dict) and item.get("json", {}).get("searchResults"):
-                                        for result in item["json"].get("searchResults", []):
-                                            sources.append({
-                                                "title": result.get("title", "Document"),
-                                                "snippet": result.get("text", "")[:200] if result.get("text") else None
-                                            })
                     except json.JSONDecodeError:
                         continue
+                    if current_event_type == "error":
+                        error_msg = data.get("message", "Unknown error from Cortex Agent")
+                        logger.error(f"Agent error: {error_msg}")
+                        AGENT_ERRORS.inc("stream")
+                        yield "error", {"message": error_msg}
+                        return
+                    if isinstance(data, dict):
+                        if current_event_type == "response.text.delta":
+                            if started is not None:
+                                AGENT_TTFT_SECONDS.observe(time.perf_counter() - started)
+                                started = None
+                            yield current_event_type, {"text": data.get("text", "")}
+                        elif current_event_type == "response.tool_use":
+                            tool_name = data.get("name", "unknown")
+                            yield current_event_type, {
+                                "name": tool_name,
+                                "type": "cortex_analyst" if "analyst" in tool_name.lower() else "cortex_search",
+                                "status": "complete"
+                            }
+                        elif current_event_type == "response.tool_result":
+                            sources = []
+                            content = data.get("content", [])
+                            for item in content:
+                                if isinstance(item, dict) and item.get("json", {}).get("searchResults"):
+                                    for result in item["json"].get("searchResults", []):
+                                        sources.append({
+                                            "title": result.get("title", "Document"),
+                                            "snippet": result.get("text", "")[:200] if result.get("text") else None
+                                        })
+                            yield current_event_type, {"sources": sources}
+
+    def call_cortex_agent(self, user_message: str) -> Dict[str, Any]:
+        """Call the Cortex Agent REST API and return parsed response."""
+        text_parts = []
+        tool_calls = []
+        sources = []
+
+        started = time.perf_counter()
+        with self._open_agent_stream(user_message) as response:
+            for event_type, data in self._iter_agent_events(response, started):
+                if event_type == "error":
+                    return {
+                        "response": f"The Cortex Agent encountered an error: {data['message']}",
+                        "tool_calls": [],
+                        "sources": [],
+                        "error": data["message"],
+                    }
+                if event_type == "response.text.delta":
+                    text_parts.append(data["text"])
+                elif event_type == "response.tool_use":
+                    tool_calls.append(data)
+                elif event_type == "response.tool_result":
+                    sources.extend(data["sources"])
 
         logger.info(f"Agent response text parts: {len(text_parts)}")
         return {
@@ -159,6 +740,111 @@ class SnowflakeService:
             "sources": sources
         }
 
+    async def call_cortex_agent_async(self, user_message: str) -> Dict[str, Any]:
+        """Run call_cortex_agent on the chat executor without blocking the event loop."""
+        async with self._admission.slot("chat"):
+            return await self._run_blocking("chat", self.call_cortex_agent, user_message)
+
+    async def answer_fingerprint(self) -> Optional[str]:
+        """Data-version token for the answer cache, or None if it can't be determined."""
+        try:
+            rows = await self.execute_query_cached(
+                ANSWER_FINGERPRINT_QUERY, timeout=10, ttl=ANSWER_FINGERPRINT_TTL, workload="chat"
+            )
+        except Exception as e:
+            logger.warning(f"Could not compute answer fingerprint, skipping answer cache: {e}")
+            return None
+        return "|".join(str(value) for value in rows[0].values()) if rows else None
+
+    async def get_cached_answer(self, user_message: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Return ``(cached answer or None, current data fingerprint)``."""
+        fingerprint = await self.answer_fingerprint()
+        if fingerprint is None:
+            return None, None
+        return self._answer_cache.get(user_message, fingerprint), fingerprint
+
+    def store_answer(self, user_message: str, fingerprint: Optional[str], answer: Dict[str, Any]):
+        if fingerprint is not None and not answer.get("error"):
+            self._answer_cache.put(user_message, fingerprint, answer)
+
+    async def call_cortex_agent_cached(
+        self,
+        user_message: str,
+        bypass_cache: bool = False,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Answer from the cache when the question and data version match, else run the agent.
+
+        Returns ``(answer, served_from_cache)``. ``bypass_cache`` forces a fresh
+        agent run but still stores its answer.
+        """
+        cached, fingerprint = await self.get_cached_answer(user_message)
+        if cached is not None and not bypass_cache:
+            return cached, True
+        result = await self.call_cortex_agent_async(user_message)
+        self.store_answer(user_message, fingerprint, result)
+        return result, False
+
+    async def stream_cortex_agent(
+        self,
+        user_message: str,
+        max_buffered_events: int = 64,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield agent events as they arrive, reading the SSE stream on the executor.
+
+        At most ``max_buffered_events`` events are held between the reader thread
+        and the consumer, so a slow client applies backpressure instead of growing
+        memory. Closing the iterator (e.g. on client disconnect) stops the reader
+        and closes the upstream HTTP response.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_events)
+        stop = threading.Event()
+        done = object()
+        holder: Dict[str, requests.Response] = {}
+
+        def put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    return True
+                except FutureTimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
+
+        def produce():
+            try:
+                started = time.perf_counter()
+                response = self._open_agent_stream(user_message)
+                holder["response"] = response
+                with response:
+                    for event in self._iter_agent_events(response, started):
+                        if stop.is_set() or not put(event):
+                            return
+            except Exception as e:
+                if not stop.is_set():
+                    put(e)
+                return
+            put(done)
+
+        async with self._admission.slot("chat"):
+            producer = loop.run_in_executor(self._workloads["chat"].executor, produce)
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+                response = holder.get("response")
+                if response is not None and not producer.done():
+                    # Unblock a reader waiting on a silent upstream.
+                    response.close()
+
 
 _service: Optional[SnowflakeService] = None
 
@@ -166,7 +852,12 @@ _service: Optional[SnowflakeService] = None
 def get_snowflake_service() -> SnowflakeService:
     global _service
     if _service is None:
-        _service = SnowflakeService()
+        if os.getenv("SNOWFLAKE_BACKEND", "snowflake").lower() == "local":
+            from services.local_engine import LocalSnowflakeService
+
+            _service = LocalSnowflakeService()
+        else:
+            _service = SnowflakeService()
     return _service
 
 
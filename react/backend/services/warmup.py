@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    """Startup phases run concurrently in the background, timed individually, backing ``/ready``.
+
+    The app starts serving as soon as ``start`` is called, so liveness checks
+    pass straight away while the readiness probe reports ``ready`` only once
+    every phase has finished. A failed phase is logged and reported but does
+    not hold readiness back: the requests it would have warmed up simply take
+    the cold path.
+    """
+
+    def __init__(self, phases: Dict[str, Callable[[], Awaitable[Any]]]):
+        self._phases = phases
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._elapsed_ms: Optional[float] = None
+        self._results: Dict[str, Dict[str, Any]] = {name: {"state": "pending"} for name in phases}
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    @property
+    def ready(self) -> bool:
+        return self._task is None or self._task.done()
+
+    def start(self):
+        if self._task is None:
+            self._started_at = time.perf_counter()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_phase(self, name: str, phase: Callable[[], Awaitable[Any]]):
+        result = self._results[name]
+        result["state"] = "running"
+        start = time.perf_counter()
+        try:
+            detail = await phase()
+        except Exception as e:
+            result.update(state="failed", error=str(e))
+            logger.warning(f"Warm-up phase {name} failed after {(time.perf_counter() - start) * 1000:.0f} ms: {e}")
+        else:
+            result["state"] = "done"
+            if detail is not None:
+                result["detail"] = detail
+            logger.info(f"Warm-up phase {name} done in {(time.perf_counter() - start) * 1000:.0f} ms")
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def _run(self):
+        await asyncio.gather(*(self._run_phase(name, phase) for name, phase in self._phases.items()))
+        self._elapsed_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+        failed = [name for name, result in self._results.items() if result["state"] == "failed"]
+        logger.info(
+            f"Warm start finished in {self._elapsed_ms:.0f} ms"
+            + (f" ({', '.join(failed)} failed)" if failed else "")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed_ms = self._elapsed_ms
+        if elapsed_ms is None and self._started_at is not None:
+            elapsed_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+        return {
+            "ready": self.ready,
+            "warm_start": self.enabled,
+            "elapsed_ms": elapsed_ms,
+            "phases": {name: dict(result) for name, result in self._results.items()} if self.enabled else {},
+        }
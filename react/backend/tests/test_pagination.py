@@ -0,0 +1,47 @@
+"""Keyset pagination against the local DuckDB backend (SNOWFLAKE_BACKEND=local)."""
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("snowflake.connector")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api import main  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("SNOWFLAKE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_QUERY_LATENCY_MS", "0")
+    with TestClient(main.app) as client:
+        yield client
+
+
+def _all_pages(client, path, items, key, page_size):
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": page_size, **({"cursor": cursor} if cursor else {})}
+        body = client.get(path, params=params).json()
+        seen.extend(row[key] for row in body[items])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize(
+    "path, items, table, key, time_column",
+    [
+        ("/api/anomaly-events", "events", "PDM.ANOMALY_EVENTS", "EVENT_ID", "TIMESTAMP"),
+        ("/api/cure-results", "results", "PDM.CURE_RESULTS", "BATCH_ID", "CURE_TIMESTAMP"),
+    ],
+)
+def test_pages_continue_past_rows_without_a_timestamp(client, path, items, table, key, time_column):
+    conn = main.get_snowflake_service()._engine.connect()
+    for i in range(5):
+        conn.execute(f"INSERT INTO {table} ({key}, {time_column}) VALUES (?, NULL)", [f"NULL-KEY-{i}"])
+    expected = [row[0] for row in conn.execute(f"SELECT {key} FROM {table}").fetchall()]
+
+    seen = _all_pages(client, path, items, key, page_size=7)
+
+    assert sorted(seen) == sorted(expected)
+    assert seen[-5:] == [f"NULL-KEY-{i}" for i in reversed(range(5))]
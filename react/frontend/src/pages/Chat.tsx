@@ -297,46 +297,67 @@ export default function Chat() {
       ])
 
       try {
-        const response = await fetch('/api/chat', {
+        const response = await fetch('/api/chat/stream', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({ message: input }),
         })
 
-        const data = await response.json()
-
-        setThinkingStage('generating')
-
-        const fullText = data.response || data.content || ''
-        const words = fullText.split(' ')
-        let currentText = ''
-
-        for (let i = 0; i < words.length; i++) {
-          currentText += (i > 0 ? ' ' : '') + words[i]
-          const textToShow = currentText
+        if (!response.ok || !response.body) {
+          throw new Error(`Chat request failed with status ${response.status}`)
+        }
 
-          setMessages((prev) =>
-            prev.map((msg) =>
-              msg.id === placeholderId ? { ...msg, content: textToShow, isStreaming: i < words.length - 1 } : msg
-            )
-          )
+        const updatePlaceholder = (update: (msg: Message) => Message) =>
+          setMessages((prev) => prev.map((msg) => (msg.id === placeholderId ? update(msg) : msg)))
+
+        const handleEvent = (event: string, data: any) => {
+          switch (event) {
+            case 'response.text.delta':
+              setThinkingStage('generating')
+              updatePlaceholder((msg) => ({ ...msg, content: msg.content + (data.text || '') }))
+              break
+            case 'response.tool_use':
+              setThinkingStage(data.type === 'cortex_analyst' ? 'analyzing' : 'searching')
+              updatePlaceholder((msg) => ({ ...msg, toolCalls: [...(msg.toolCalls || []), data] }))
+              break
+            case 'response.tool_result':
+              if (data.sources?.length) {
+                updatePlaceholder((msg) => ({ ...msg, sources: [...(msg.sources || []), ...data.sources] }))
+              }
+              break
+            case 'error':
+              updatePlaceholder((msg) => ({ ...msg, content: data.message, isError: true }))
+              break
+          }
+        }
 
-          await new Promise((resolve) => setTimeout(resolve, 20))
+        // Parse the Server-Sent Events stream as it arrives so tokens render immediately.
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ''
+
+        let chunk = await reader.read()
+        while (!chunk.done) {
+          buffer += decoder.decode(chunk.value, { stream: true })
+
+          let boundary = buffer.indexOf('\n\n')
+          while (boundary !== -1) {
+            const block = buffer.slice(0, boundary)
+            buffer = buffer.slice(boundary + 2)
+            boundary = buffer.indexOf('\n\n')
+
+            let event = 'message'
+            let dataStr = ''
+            for (const line of block.split('\n')) {
+              if (line.startsWith('event:')) event = line.slice(6).trim()
+              else if (line.startsWith('data:')) dataStr += line.slice(5).trim()
+            }
+            if (dataStr) handleEvent(event, JSON.parse(dataStr))
+          }
+          chunk = await reader.read()
         }
 
-        setMessages((prev) =>
-          prev.map((msg) =>
-            msg.id === placeholderId
-              ? {
-                  ...msg,
-                  content: fullText,
-                  sources: data.sources,
-                  toolCalls: data.tool_calls,
-                  isStreaming: false,
-                }
-              : msg
-          )
-        )
+        updatePlaceholder((msg) => ({ ...msg, isStreaming: false }))
       } catch (error) {
         console.error('Chat error:', error)
         setMessages((prev) =>
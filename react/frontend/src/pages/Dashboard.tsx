@@ -2,10 +2,25 @@ import useSWR from 'swr'
 import { MetricCard } from '../components/MetricCard'
 import { AssetTile, type Asset } from '../components/AssetTile'
 import { PriorityTable } from '../components/PriorityTable'
-import { AlertTriangle, Clock, DollarSign, TrendingUp } from 'lucide-react'
+import { Activity, AlertTriangle, Clock, DollarSign, Radio, TrendingUp, Zap } from 'lucide-react'
 
 const fetcher = (url: string) => fetch(url).then((r) => r.json())
 
+// /api/snapshot: every landing-view section in one round trip. A failed
+// section has ok: false and an error instead of its data.
+type SnapshotSection<T> = { ok: boolean; error?: string; elapsed_ms: number } & Partial<T>
+
+interface DashboardSnapshot {
+  version: number
+  generated_at: string
+  sections: {
+    decisions: SnapshotSection<{ decisions: Asset[] }>
+    anomalies: SnapshotSection<{ events: unknown[]; next_cursor: string | null }>
+    triggers: SnapshotSection<{ triggers: { asset_id: string; trigger_active: boolean }[] }>
+    tasks: SnapshotSection<{ tasks: { name: string; state: string }[] }>
+  }
+}
+
 function DashboardSkeleton() {
   return (
     <div className="p-6 space-y-6 animate-pulse">
@@ -26,10 +41,11 @@ function DashboardSkeleton() {
 }
 
 export function Dashboard() {
-  const { data, error, isLoading } = useSWR<{ decisions: Asset[] }>('/api/decisions', fetcher)
+  const { data, error, isLoading } = useSWR<DashboardSnapshot>('/api/snapshot', fetcher)
 
   if (isLoading) return <DashboardSkeleton />
-  if (error) {
+  const sections = data?.sections
+  if (error || !sections?.decisions.ok) {
     return (
       <div className="p-6">
         <div className="card border-accent-red/50 bg-accent-red/5">
@@ -43,7 +59,10 @@ export function Dashboard() {
     )
   }
 
-  const decisions = data?.decisions || []
+  const decisions = sections.decisions.decisions || []
+  const { anomalies, triggers, tasks } = sections
+  const activeTriggers = (triggers.triggers || []).filter((t) => t.trigger_active).length
+  const generationTask = (tasks.tasks || []).find((t) => t.name === 'SENSOR_GENERATION_TASK')
   const urgentCount = decisions.filter((d) => d.RECOMMENDATION === 'URGENT').length
   const planPMCount = decisions.filter((d) => d.RECOMMENDATION === 'PLAN_PM').length
   const totalExpectedLoss = decisions.reduce((sum, d) => sum + d.EXPECTED_UNPLANNED_COST, 0)
@@ -90,6 +109,28 @@ export function Dashboard() {
         />
       </div>
 
+      <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+        <MetricCard
+          title="Recent Anomalies"
+          value={anomalies.ok ? `${(anomalies.events || []).length}${anomalies.next_cursor ? '+' : ''}` : '—'}
+          subtitle={anomalies.ok ? 'Latest anomaly events' : 'Unavailable'}
+          icon={<Activity size={20} className="text-accent-yellow" />}
+        />
+        <MetricCard
+          title="Injected Anomalies"
+          value={triggers.ok ? activeTriggers : '—'}
+          subtitle={triggers.ok ? 'Assets with an active trigger' : 'Unavailable'}
+          icon={<Zap size={20} className="text-accent-red" />}
+          variant={activeTriggers > 0 ? 'warning' : 'default'}
+        />
+        <MetricCard
+          title="Sensor Simulation"
+          value={tasks.ok && generationTask ? generationTask.state : '—'}
+          subtitle={tasks.ok ? 'SENSOR_GENERATION_TASK' : 'Unavailable'}
+          icon={<Radio size={20} className="text-accent-blue" />}
+        />
+      </div>
+
       <div>
         <h2 className="text-lg font-semibold text-slate-200 mb-4">Top Priority Assets</h2>
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
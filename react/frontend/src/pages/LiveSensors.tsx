@@ -1,4 +1,4 @@
-import { memo, useState, useMemo, useEffect } from 'react'
+import { memo, useState, useMemo, useEffect, useRef, useCallback } from 'react'
 import useSWR from 'swr'
 import {
   Activity,
@@ -34,6 +34,25 @@ interface AssetSensorData {
   INGESTION_TIME: string
 }
 
+interface LiveSensorsResponse {
+  sensors: AssetSensorData[]
+  timestamp: string | null
+  watermark: string | null
+}
+
+// Rows ingested longer ago than this are dropped from the merged window.
+const LIVE_WINDOW_MS = 30_000
+
+const ingestedAt = (d: AssetSensorData) => new Date(d.INGESTION_TIME).getTime()
+
+// `now` is in the same clock as INGESTION_TIME, so the window keeps moving (and
+// stale rows age out) even when a poll brings nothing new.
+function mergeSensorWindow(prev: AssetSensorData[], delta: AssetSensorData[], now: number): AssetSensorData[] {
+  return [...delta, ...prev]
+    .filter((d) => ingestedAt(d) > now - LIVE_WINDOW_MS)
+    .sort((a, b) => a.ASSET_ID.localeCompare(b.ASSET_ID) || b.EVENT_TIME.localeCompare(a.EVENT_TIME))
+}
+
 interface SensorHistory {
   time: string
   value: number
@@ -213,15 +232,39 @@ export default function LiveSensors() {
   const [selectedSensors, setSelectedSensors] = useState<SensorKey[]>(['temperature', 'humidity', 'pressure', 'vibration', 'vacuum'])
   const refreshInterval = autoRefresh ? 1000 : 0
 
-  const { data: sensorData, isLoading, mutate } = useSWR(
+  const [liveSensors, setLiveSensors] = useState<AssetSensorData[]>([])
+  const [sensorTimestamp, setSensorTimestamp] = useState<string | null>(null)
+  const watermarkRef = useRef<string | null>(null)
+  // INGESTION_TIME minus the browser clock, taken from the newest row seen, so
+  // pruning follows the server's clock rather than the browser's time zone.
+  const clockOffsetRef = useRef(0)
+
+  // After the first full window, only ask for rows newer than the last watermark and merge them in.
+  const deltaFetcher = useCallback((url: string): Promise<LiveSensorsResponse> => {
+    const since = watermarkRef.current
+    return fetcher(since ? `${url}?since=${encodeURIComponent(since)}` : url)
+  }, [])
+
+  const { isLoading, mutate } = useSWR<LiveSensorsResponse>(
     `${API_BASE}/api/live-sensors-by-asset`,
-    fetcher,
-    { refreshInterval }
+    deltaFetcher,
+    {
+      refreshInterval,
+      onSuccess: (delta) => {
+        watermarkRef.current = delta.watermark || watermarkRef.current
+        if (delta.sensors.length > 0) {
+          clockOffsetRef.current = Math.max(...delta.sensors.map(ingestedAt)) - Date.now()
+          setSensorTimestamp(delta.timestamp)
+        }
+        const now = Date.now() + clockOffsetRef.current
+        setLiveSensors((prev) => {
+          const next = mergeSensorWindow(prev, delta.sensors, now)
+          return next.length === prev.length && delta.sensors.length === 0 ? prev : next
+        })
+      },
+    }
   )
 
-  const liveSensors: AssetSensorData[] = sensorData?.sensors || []
-  const sensorTimestamp: string | null = sensorData?.timestamp || null
-
   const assets = useMemo(() => {
     const assetsWithData = liveSensors.reduce((acc, sensor) => {
       const hasSensorData = 
@@ -335,6 +335,14 @@ CREATE OR REPLACE TABLE PDM.GNN_PROPAGATION_SCORES (
     CREATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
 );
 
+-- Single-row index of the newest GNN run, rewritten by the GNN notebook after
+-- each write so readers can filter GNN_PROPAGATION_SCORES by an exact
+-- RUN_TIMESTAMP instead of scanning the history for MAX(RUN_TIMESTAMP).
+CREATE OR REPLACE TABLE PDM.GNN_LATEST_RUN (
+    RUN_TIMESTAMP TIMESTAMP_NTZ,
+    UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
 CREATE OR REPLACE TABLE PDM.MODEL_METRICS (
     METRIC_ID STRING DEFAULT UUID_STRING(),
     MODEL_NAME STRING,
@@ -5,6 +5,7 @@ USE DATABASE SNOWCORE_PDM;
 USE SCHEMA PDM;
 
 -- 1. Python UDTF to generate sensor readings with optional anomaly injection
+--    (inject_anomaly_asset is one asset id or a comma-separated list)
 CREATE OR REPLACE FUNCTION GENERATE_SENSOR_READINGS(
     num_seconds INT,
     inject_anomaly_asset VARCHAR
@@ -35,6 +36,7 @@ class SensorGenerator:
     
     def process(self, num_seconds, inject_anomaly_asset):
         base_time = datetime.utcnow()
+        anomaly_assets = set((inject_anomaly_asset or '').split(','))
         
         for sec in range(num_seconds):
             ts = base_time - timedelta(seconds=num_seconds - sec - 1)
@@ -45,7 +47,7 @@ class SensorGenerator:
                 for i, (name, low, high) in enumerate(config['metrics']):
                     value = random.uniform(low, high)
                     
-                    if asset_id == inject_anomaly_asset:
+                    if asset_id in anomaly_assets:
                         if name == 'VacuumLevel':
                             value = value + 0.15
                         elif name == 'Humidity':
@@ -106,7 +108,7 @@ INSERT INTO RAW.IOT_STREAMING_LIVE (RECORD_METADATA, RECORD_CONTENT, INGESTION_T
 SELECT RECORD_METADATA, RECORD_CONTENT, INGESTION_TIME 
 FROM TABLE(PDM.GENERATE_SENSOR_READINGS(
     60, 
-    COALESCE((SELECT ASSET_ID FROM CONFIG.ANOMALY_TRIGGERS WHERE TRIGGER_ACTIVE = TRUE LIMIT 1), ''::VARCHAR)
+    COALESCE((SELECT LISTAGG(ASSET_ID, ',') FROM CONFIG.ANOMALY_TRIGGERS WHERE TRIGGER_ACTIVE = TRUE), ''::VARCHAR)
 ));
 
 -- 4b. Cleanup task to remove old data